@@ -0,0 +1,242 @@
+##
+##
+
+import attr
+import time
+import socket
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Union, List, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from aiohttp import TCPConnector
+from urllib3.poolmanager import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+from restfull.ratelimit import RateLimiter
+from restfull.retry import PolicyRetry
+
+
+@attr.s
+class PoolStats:
+    created: int = attr.ib(default=0)
+    checkouts: int = attr.ib(default=0)
+    discarded: int = attr.ib(default=0)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, repr=False, eq=False)
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.checkouts - self.created)
+
+    def count(self, name: str):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def reset(self):
+        with self.lock:
+            self.created = 0
+            self.checkouts = 0
+            self.discarded = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "discarded": self.discarded,
+            "checkouts": self.checkouts
+        }
+
+
+connection_timings = threading.local()
+tls_time: ContextVar[Union[float, None]] = ContextVar("tls_time", default=None)
+retries_enabled: ContextVar[bool] = ContextVar("retries_enabled", default=True)
+
+
+@contextmanager
+def retries_disabled():
+    token = retries_enabled.set(False)
+    try:
+        yield
+    finally:
+        retries_enabled.reset(token)
+
+
+def reset_timings():
+    connection_timings.values = {}
+
+
+def record_timing(name: str, value):
+    values = getattr(connection_timings, "values", None)
+    if values is not None:
+        values[name] = value
+
+
+class TimedConnectionMixin(object):
+
+    def _new_conn(self):
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)))
+        except socket.gaierror:
+            return super()._new_conn()
+        record_timing("dns", time.perf_counter() - start)
+        start = time.perf_counter()
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+        self.tcp_time = time.perf_counter() - start
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        self.tcp_time = None
+        super().connect()
+        elapsed = time.perf_counter() - start
+        record_timing("connect", self.tcp_time if self.tcp_time is not None else elapsed)
+        if isinstance(self, HTTPSConnection) and self.tcp_time is not None:
+            record_timing("tls", elapsed - self.tcp_time)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedTCPConnector(TCPConnector):
+
+    async def _wrap_create_connection(self, factory, *args, **kwargs):
+        tls_time.set(None)
+        if not kwargs.get("ssl"):
+            return await super()._wrap_create_connection(factory, *args, **kwargs)
+        connected = []
+
+        def protocol_factory():
+            connected.append(time.perf_counter())
+            return factory()
+
+        result = await super()._wrap_create_connection(protocol_factory, *args, **kwargs)
+        if connected:
+            tls_time.set(time.perf_counter() - connected[0])
+        return result
+
+
+class PoolStatsMixin(object):
+    stats: Union[PoolStats, None] = None
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        if self.stats is not None:
+            self.stats.count("created")
+        return conn
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        if self.stats is not None:
+            self.stats.count("checkouts")
+        record_timing("reused", getattr(conn, "sock", None) is not None)
+        return conn
+
+    def _put_conn(self, conn):
+        if self.stats is not None and conn is not None and self.pool is not None and self.pool.full():
+            self.stats.count("discarded")
+        super()._put_conn(conn)
+
+
+class StatsHTTPConnectionPool(PoolStatsMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class StatsHTTPSConnectionPool(PoolStatsMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class StatsPoolManager(PoolManager):
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        self.pool_classes_by_scheme = {"http": StatsHTTPConnectionPool, "https": StatsHTTPSConnectionPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.stats = self.stats
+        return pool
+
+
+def keepalive_socket_options(idle: Union[int, None]) -> List[Tuple[int, int, int]]:
+    options = list(HTTPConnection.default_socket_options)
+    if idle is None:
+        return options
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    elif hasattr(socket, "TCP_KEEPALIVE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, idle // 3)))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3))
+    return options
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+
+    def __init__(self, stats: Union[PoolStats, None] = None, tcp_keepalive: Union[int, None] = None, rate_limiter: Union[RateLimiter, None] = None, **kwargs):
+        self.stats = stats if stats is not None else PoolStats()
+        self.tcp_keepalive = tcp_keepalive
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    @property
+    def max_retries(self) -> Retry:
+        return self._max_retries if retries_enabled.get() else Retry(0, read=False)
+
+    @max_retries.setter
+    def max_retries(self, value: Retry):
+        self._max_retries = value
+
+    def send(self, request, **kwargs):
+        if isinstance(self.max_retries, PolicyRetry) and self.max_retries.policy is not None:
+            self.max_retries.policy.record_request()
+        limiter = self.rate_limiter
+        path = urlsplit(request.url).path
+        if limiter is not None:
+            limiter.acquire(path)
+        reset_timings()
+        response = super().send(request, **kwargs)
+        response.timings = connection_timings.values
+        connection_timings.values = None
+        retries = getattr(response.raw, "retries", None)
+        response.timings["retries"] = len(retries.history) if retries is not None else 0
+        if limiter is not None:
+            limiter.update(path, response.status_code, response.headers)
+        return response
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        pool_kwargs.setdefault("socket_options", keepalive_socket_options(self.tcp_keepalive))
+        self.poolmanager = StatsPoolManager(self.stats, num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs)
+
+    def __setstate__(self, state):
+        state.setdefault("stats", PoolStats())
+        state.setdefault("tcp_keepalive", None)
+        state.setdefault("rate_limiter", None)
+        super().__setstate__(state)
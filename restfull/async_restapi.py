@@ -0,0 +1,113 @@
+##
+##
+
+import logging
+from typing import Union, Any, Iterable
+from aiohttp import ClientConnectorError
+from urllib3.util.retry import Retry
+from pytoolbase.exceptions import NonFatalError
+from restfull.restapi import RestAPI
+from restfull.response import RestResponse
+from restfull.paging import Paging
+from restfull.query import Predicate
+
+logger = logging.getLogger('restfull.async_restapi')
+logger.addHandler(logging.NullHandler())
+
+
+class AsyncRestAPI(RestAPI):
+
+    async def request_async(self, method: str, endpoint: str, body: Union[dict, None] = None) -> RestResponse:
+        responses = []
+
+        async def attempt() -> RestResponse:
+            response = await self.send_async(method, endpoint, body)
+            if response.code in self.retry_policy.status_codes and method.upper() in Retry.DEFAULT_ALLOWED_METHODS:
+                responses.append(response)
+                self.check_response(response.code, response.text, response.headers)
+            return response
+
+        try:
+            return await self.retry_policy.run_async(attempt, allow=(ClientConnectorError,))
+        except NonFatalError as err:
+            if responses and getattr(err, "status", None) == responses[-1].code:
+                return responses[-1]
+            raise
+
+    async def get(self, endpoint: str):
+        return await self.request_async("GET", endpoint)
+
+    async def get_bytes(self, endpoint: str):
+        return await self.request_async("GET", endpoint)
+
+    async def get_by_page(self, endpoint: str, page_tag: str = "page", page: int = 1, per_page_tag: Union[str, None] = None, per_page: int = 10):
+        return await self.request_async("GET", self.paged_endpoint(endpoint, page_tag, page, per_page_tag, per_page))
+
+    async def post(self, endpoint: str, body: dict):
+        return await self.request_async("POST", endpoint, body)
+
+    async def patch(self, endpoint: str, body: dict):
+        return await self.request_async("PATCH", endpoint, body)
+
+    async def put(self, endpoint: str, body: dict):
+        return await self.request_async("PUT", endpoint, body)
+
+    async def delete(self, endpoint: str):
+        return await self.request_async("DELETE", endpoint)
+
+    async def upload(self, endpoint: str, source: Any, method: str = "POST", content_type: str = "application/octet-stream", chunk_size: int = 1048576):
+        return await self.upload_async(endpoint, source, method, content_type, chunk_size)
+
+    async def upload_ndjson(self, endpoint: str, records: Iterable[Any], method: str = "POST", chunk_size: int = 1048576):
+        return await self.upload_ndjson_async(endpoint, records, method, chunk_size)
+
+    async def get_paged(self,
+                        endpoint: str,
+                        page_tag: str = "page",
+                        total_tag: str = "total",
+                        pages_tag: str = "total_pages",
+                        per_page_tag: str = None,
+                        per_page: int = 10,
+                        data_key="data",
+                        cursor: str = None,
+                        category: str = None,
+                        concurrency: int = 16,
+                        adaptive: bool = False,
+                        ordered: bool = False,
+                        paging: Union[Paging, None] = None,
+                        compact: bool = False,
+                        spill: bool = False,
+                        spill_dir: Union[str, None] = None):
+        self.response_dict = await self.get_paged_endpoint(endpoint, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category,
+                                                           concurrency, adaptive, ordered, paging, compact, spill, spill_dir)
+        return self
+
+    async def search_paged(self,
+                           endpoint: str,
+                           predicate: Predicate,
+                           page_tag: str = "page",
+                           total_tag: str = "total",
+                           pages_tag: str = "total_pages",
+                           per_page_tag: str = None,
+                           per_page: int = 10,
+                           data_key="data",
+                           cursor: str = None,
+                           category: str = None,
+                           concurrency: int = 16,
+                           adaptive: bool = False,
+                           ordered: bool = False,
+                           paging: Union[Paging, None] = None,
+                           first: bool = False,
+                           unique: bool = False):
+        self.response_dict = await self.search_paged_async(endpoint, predicate, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category,
+                                                           concurrency, adaptive, ordered, paging, first, unique)
+        return self
+
+    async def download(self,
+                       endpoint: str,
+                       filename: str,
+                       chunk_size: int = 1048576,
+                       resume: bool = False,
+                       segments: int = 1,
+                       checksum: Union[str, None] = None) -> Union[str, None]:
+        return await self.download_async(endpoint, filename, chunk_size, resume, segments, checksum)
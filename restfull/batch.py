@@ -0,0 +1,62 @@
+##
+##
+
+import attr
+import json
+from typing import Union, Any, Callable
+from urllib3.util.retry import Retry
+
+
+@attr.s
+class BatchRequest:
+    endpoint: str = attr.ib()
+    method: str = attr.ib(default="GET", converter=str.upper)
+    body: Union[dict, None] = attr.ib(default=None)
+    retry: Union[bool, None] = attr.ib(default=None)
+
+    @property
+    def idempotent(self) -> bool:
+        return self.method in Retry.DEFAULT_ALLOWED_METHODS
+
+    @property
+    def retryable(self) -> bool:
+        return self.retry if self.retry is not None else self.idempotent
+
+    @classmethod
+    def from_item(cls, item: Any):
+        if isinstance(item, BatchRequest):
+            return item
+        if isinstance(item, str):
+            return cls(item)
+        if isinstance(item, dict):
+            return cls(item["endpoint"], item.get("method", "GET"), item.get("body"), item.get("retry"))
+        method, endpoint, *body = item
+        return cls(endpoint, method, body[0] if body else None)
+
+
+@attr.s
+class BatchResult:
+    index: int = attr.ib()
+    request: BatchRequest = attr.ib()
+    code: Union[int, None] = attr.ib(default=None)
+    text: Union[str, None] = attr.ib(default=None)
+    error: Union[Exception, None] = attr.ib(default=None)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def json(self, data_key: Union[str, None] = None):
+        try:
+            payload = json.loads(self.text)
+            return payload.get(data_key) if data_key is not None else payload
+        except (TypeError, json.decoder.JSONDecodeError, AttributeError):
+            return {}
+
+    def unwrap(self):
+        if self.error is not None:
+            raise self.error
+        return self
+
+
+ProgressCallback = Callable[[int, Union[int, None], BatchResult], Any]
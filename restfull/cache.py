@@ -0,0 +1,300 @@
+##
+##
+
+import os
+import attr
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Union, Any, Tuple, Mapping
+from requests.structures import CaseInsensitiveDict
+
+UNPARSED = object()
+
+
+def request_key(url: str, headers: Union[Mapping[str, str], None] = None) -> str:
+    authorization = (headers or {}).get("Authorization", "")
+    scope = hashlib.sha256(authorization.encode('utf-8')).hexdigest()[:16] if authorization else "-"
+    return f"{scope} {url}"
+
+
+@attr.s
+class CacheEntry:
+    url: str = attr.ib()
+    code: int = attr.ib()
+    body: bytes = attr.ib(repr=False)
+    encoding: Union[str, None] = attr.ib(default=None)
+    headers: dict = attr.ib(factory=dict, repr=False)
+    stored: float = attr.ib(factory=time.time)
+    parsed: Any = attr.ib(default=UNPARSED, repr=False, eq=False)
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @property
+    def etag(self) -> Union[str, None]:
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self) -> Union[str, None]:
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    def age(self) -> float:
+        return time.time() - self.stored
+
+
+@attr.s
+class CacheStats:
+    hits: int = attr.ib(default=0)
+    misses: int = attr.ib(default=0)
+    revalidated: int = attr.ib(default=0)
+    stores: int = attr.ib(default=0)
+    evictions: int = attr.ib(default=0)
+    lock: threading.Lock = attr.ib(factory=threading.Lock, repr=False, eq=False)
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": self.hit_ratio
+        }
+
+
+class MemoryCache(object):
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 67108864):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stats: Union[CacheStats, None] = None
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Union[CacheEntry, None]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        if entry.size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self.entries[key] = entry
+            self.size += entry.size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= evicted.size
+                if self.stats is not None:
+                    self.stats.count("evictions")
+
+    def delete(self, key: str):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry.size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class DiskCache(object):
+
+    def __init__(self, directory: str, max_bytes: int = 1073741824):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats: Union[CacheStats, None] = None
+        self.lock = threading.Lock()
+        self.index = OrderedDict()
+        self.size = 0
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for name in os.listdir(directory):
+            if name.endswith(".body"):
+                path = os.path.join(directory, name)
+                files.append((os.path.getmtime(path), name[:-5], os.path.getsize(path)))
+        for _, name, size in sorted(files):
+            self.index[name] = size
+            self.size += size
+
+    @staticmethod
+    def file_name(key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{name}.{suffix}")
+
+    def get(self, key: str) -> Union[CacheEntry, None]:
+        name = self.file_name(key)
+        with self.lock:
+            if name not in self.index:
+                return None
+            self.index.move_to_end(name)
+        try:
+            with open(self.path(name, "meta"), 'r') as fd:
+                meta = json.load(fd)
+            with open(self.path(name, "body"), 'rb') as fd:
+                body = fd.read()
+            if "sha256" in meta and hashlib.sha256(body).hexdigest() != meta["sha256"]:
+                return None
+            os.utime(self.path(name, "body"))
+        except (OSError, ValueError, KeyError):
+            self.delete(key)
+            return None
+        return CacheEntry(meta["url"], meta["code"], body, meta["encoding"], meta["headers"], meta["stored"])
+
+    def set(self, key: str, entry: CacheEntry):
+        if entry.size > self.max_bytes:
+            return
+        name = self.file_name(key)
+        meta = {"url": entry.url, "code": entry.code, "encoding": entry.encoding, "headers": entry.headers, "stored": entry.stored,
+                "sha256": hashlib.sha256(entry.body).hexdigest()}
+        self.write(self.path(name, "body"), entry.body)
+        self.write(self.path(name, "meta"), json.dumps(meta).encode('utf-8'))
+        with self.lock:
+            self.size -= self.index.pop(name, 0)
+            self.index[name] = entry.size
+            self.size += entry.size
+            while self.size > self.max_bytes and self.index:
+                evicted, size = self.index.popitem(last=False)
+                self.size -= size
+                self.remove(evicted)
+                if self.stats is not None:
+                    self.stats.count("evictions")
+
+    def write(self, path: str, data: bytes):
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, 'wb') as fd:
+                fd.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+
+    def remove(self, name: str):
+        for suffix in ("body", "meta"):
+            try:
+                os.remove(self.path(name, suffix))
+            except OSError:
+                pass
+
+    def delete(self, key: str):
+        name = self.file_name(key)
+        with self.lock:
+            self.size -= self.index.pop(name, 0)
+        self.remove(name)
+
+    def clear(self):
+        with self.lock:
+            names = list(self.index)
+            self.index.clear()
+            self.size = 0
+        for name in names:
+            self.remove(name)
+
+
+class ResponseCache(object):
+
+    def __init__(self, backend: Union[MemoryCache, DiskCache, None] = None, ttl: float = 300.0, share_parsed: bool = False):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttl = ttl
+        self.share_parsed = share_parsed
+        self.stats = CacheStats()
+        self.backend.stats = self.stats
+
+    @staticmethod
+    def key(url: str, headers: Union[Mapping[str, str], None] = None) -> str:
+        return request_key(url, headers)
+
+    def lookup(self, key: str) -> Tuple[Union[CacheEntry, None], bool]:
+        entry = self.backend.get(key)
+        if entry is None:
+            self.stats.count("misses")
+            return None, False
+        if entry.age() < self.ttl:
+            self.stats.count("hits")
+            return entry, True
+        if entry.etag is None and entry.last_modified is None:
+            self.backend.delete(key)
+            self.stats.count("misses")
+            return None, False
+        return entry, False
+
+    def parsed(self, entry: CacheEntry) -> Any:
+        return entry.parsed if self.share_parsed else UNPARSED
+
+    def keep_parsed(self, entry: CacheEntry, parsed: Any):
+        if self.share_parsed:
+            entry.parsed = parsed
+
+    def update(self,
+               key: str,
+               entry: Union[CacheEntry, None],
+               url: str,
+               code: int,
+               body: bytes,
+               encoding: Union[str, None],
+               headers: Mapping[str, str]) -> Union[CacheEntry, None]:
+        if entry is not None and code == 304:
+            return self.refresh(key, entry, headers)
+        if entry is not None:
+            self.stats.count("misses")
+        return self.store(key, url, code, body, encoding, headers)
+
+    @staticmethod
+    def conditional_headers(entry: Union[CacheEntry, None]) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def refresh(self, key: str, entry: CacheEntry, headers: Mapping[str, str]) -> CacheEntry:
+        self.stats.count("revalidated")
+        for name in ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date"):
+            if name in headers:
+                entry.headers[name] = headers[name]
+        entry.stored = time.time()
+        self.backend.set(key, entry)
+        return entry
+
+    def store(self, key: str, url: str, code: int, body: bytes, encoding: Union[str, None], headers: Mapping[str, str]) -> Union[CacheEntry, None]:
+        if code != 200 or "no-store" in headers.get("Cache-Control", ""):
+            return None
+        if self.ttl <= 0 and headers.get("ETag") is None and headers.get("Last-Modified") is None:
+            return None
+        entry = CacheEntry(url, code, body, encoding, dict(headers))
+        self.backend.set(key, entry)
+        self.stats.count("stores")
+        return entry
+
+    def clear(self):
+        self.backend.clear()
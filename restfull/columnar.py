@@ -0,0 +1,265 @@
+##
+##
+
+import sys
+import operator
+from array import array
+from typing import Union, Any, Dict, List, Iterable, Callable
+from restfull.store import RecordStore
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MISSING = 0
+PRESENT = 1
+NULL = 2
+INT_MIN = -(2 ** 63)
+INT_MAX = 2 ** 63 - 1
+
+operators: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda item, values: item in values,
+    "contains": lambda item, value: value in item
+}
+
+
+def value_kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int" if INT_MIN <= value <= INT_MAX else "object"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    return "object"
+
+
+class Column(object):
+
+    def __init__(self, length: int = 0):
+        self.kind: Union[str, None] = None
+        self.data: Any = None
+        self.strings: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.states = bytearray(length)
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def start(self, kind: str):
+        length = len(self.states)
+        self.kind = kind
+        if kind == "bool":
+            self.data = array('b', bytes(length))
+        elif kind == "int":
+            self.data = array('q', bytes(8 * length))
+        elif kind == "float":
+            self.data = array('d', bytes(8 * length))
+        elif kind == "str":
+            self.data = array('l', bytes(array('l').itemsize * length))
+        else:
+            self.data = [None] * length
+
+    def to_object(self):
+        values = [self.get(i) for i in range(len(self.states))]
+        self.kind = "object"
+        self.data = values
+        self.strings = []
+        self.codes = {}
+
+    def append(self, value: Any, state: int = PRESENT):
+        if state == PRESENT and value is None:
+            state = NULL
+        if state != PRESENT:
+            if self.data is not None:
+                self.data.append(0 if self.kind != "object" else None)
+            self.states.append(state)
+            return
+        kind = value_kind(value)
+        if self.kind is None:
+            self.start(kind)
+        elif self.kind != kind and self.kind != "object":
+            self.to_object()
+        if self.kind == "str":
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.strings)
+                self.strings.append(sys.intern(value))
+            self.data.append(code)
+        else:
+            self.data.append(value)
+        self.states.append(PRESENT)
+
+    def get(self, index: int) -> Any:
+        if self.states[index] != PRESENT:
+            return None
+        if self.kind == "str":
+            return self.strings[self.data[index]]
+        if self.kind == "bool":
+            return bool(self.data[index])
+        return self.data[index]
+
+    def values(self) -> List[Any]:
+        if self.kind == "str":
+            strings = self.strings
+            return [strings[code] if state == PRESENT else None for code, state in zip(self.data, self.states)]
+        if self.kind is None:
+            return [None] * len(self.states)
+        if MISSING not in self.states and NULL not in self.states:
+            return [bool(v) for v in self.data] if self.kind == "bool" else list(self.data)
+        return [self.get(i) for i in range(len(self.states))]
+
+    def select(self, op: str, value: Any) -> List[int]:
+        states = self.states
+        if self.kind == "str" and op in ("==", "!=") and isinstance(value, str):
+            code = self.codes.get(value, -1)
+            if op == "==":
+                return [i for i, (c, s) in enumerate(zip(self.data, states)) if c == code and s == PRESENT]
+            return [i for i, (c, s) in enumerate(zip(self.data, states)) if c != code or s != PRESENT]
+        if numpy is not None and self.kind in ("int", "float", "bool") and op in ("==", "!=", ">", ">=", "<", "<=") and value_kind(value) in ("int", "float", "bool"):
+            data = numpy.frombuffer(self.data, dtype={"int": numpy.int64, "float": numpy.float64, "bool": numpy.int8}[self.kind])
+            present = numpy.frombuffer(bytes(states), dtype=numpy.uint8) == PRESENT
+            mask = operators[op](data, value) & present
+            if op == "!=":
+                mask |= ~present
+            return numpy.flatnonzero(mask).tolist()
+        test = operators[op]
+        result = []
+        for index, item in enumerate(self.values()):
+            try:
+                if (item is not None or op == "!=") and test(item, value):
+                    result.append(index)
+            except TypeError:
+                pass
+        return result
+
+    def copy(self) -> 'Column':
+        column = Column()
+        column.kind = self.kind
+        column.data = self.data[:] if self.data is not None else None
+        column.strings = list(self.strings)
+        column.codes = dict(self.codes)
+        column.states = bytearray(self.states)
+        return column
+
+    def take(self, indices: Iterable[int]) -> 'Column':
+        column = Column()
+        for index in indices:
+            column.append(self.get(index), self.states[index])
+        return column
+
+    @property
+    def nbytes(self) -> int:
+        size = len(self.states)
+        if self.kind == "object":
+            size += sys.getsizeof(self.data) + sum(sys.getsizeof(item) for item in self.data)
+        elif self.data is not None:
+            size += self.data.itemsize * len(self.data)
+        size += sum(sys.getsizeof(item) for item in self.strings)
+        return size
+
+
+class ColumnStore(RecordStore):
+
+    def __init__(self):
+        super().__init__()
+        self.columns: Dict[str, Column] = {}
+        self.length = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> 'ColumnStore':
+        store = cls()
+        store.extend(records)
+        return store
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, record: dict):
+        if not isinstance(record, dict):
+            raise TypeError(f"Compact storage requires dict records, got {type(record).__name__}")
+        for key, value in record.items():
+            if key not in self.columns:
+                self.columns[key] = Column(self.length)
+            self.columns[key].append(value)
+        for key, column in self.columns.items():
+            if len(column) == self.length:
+                column.append(None, MISSING)
+        self.length += 1
+        self.orders.clear()
+
+    def extend(self, records: Iterable[dict]):
+        for record in records:
+            self.append(record)
+
+    def record(self, index: int) -> dict:
+        return {key: column.get(index) for key, column in self.columns.items() if column.states[index] != MISSING}
+
+    def column(self, key: str) -> List[Any]:
+        return self.values(key)
+
+    def values(self, key: str) -> List[Any]:
+        column = self.columns.get(key)
+        if column is not None:
+            return column.values()
+        return super().values(key)
+
+    def select(self, key: str, op: str = "==", value: Any = None) -> List[int]:
+        if op not in operators:
+            raise ValueError(f"Unknown operator {op}, choose from {', '.join(operators)}")
+        column = self.columns.get(key)
+        if column is not None:
+            return column.select(op, value)
+        test = operators[op]
+        return [i for i, item in enumerate(super().values(key)) if item is not None and test(item, value)]
+
+    def take(self, indices: Iterable[int]) -> 'ColumnStore':
+        indices = list(indices)
+        store = ColumnStore()
+        store.columns = {key: column.take(indices) for key, column in self.columns.items()}
+        store.length = len(indices)
+        return store
+
+    def filter(self, key: str, op: str = "==", value: Any = None) -> 'ColumnStore':
+        return self.take(self.select(key, op, value))
+
+    def sort(self, key: str, reverse: bool = False) -> 'ColumnStore':
+        return self.take(self.argsort(key, reverse))
+
+    def project(self, *keys: str) -> 'ColumnStore':
+        store = ColumnStore()
+        store.columns = {key: self.columns[key].copy() for key in keys if key in self.columns}
+        store.length = self.length
+        return store
+
+    def lookup(self, key: str, value: Any) -> List[dict]:
+        if key in self.columns and not isinstance(value, (dict, list)):
+            return [self.record(index) for index in self.select(key, "==", value)]
+        return super().lookup(key, value)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def to_numpy(self, key: str):
+        if numpy is None:
+            raise ImportError("numpy is required for to_numpy(), install restfull[numpy]")
+        column = self.columns[key]
+        if column.kind in ("int", "float", "bool") and NULL not in column.states and MISSING not in column.states:
+            return numpy.array(column.data, dtype={"int": numpy.int64, "float": numpy.float64, "bool": numpy.bool_}[column.kind])
+        return numpy.array(column.values(), dtype=object)
+
+    def to_pandas(self):
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("pandas is required for to_pandas(), install restfull[pandas]")
+        return pandas.DataFrame({key: self.to_numpy(key) if numpy is not None else column.values() for key, column in self.columns.items()})
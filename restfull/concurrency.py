@@ -0,0 +1,96 @@
+##
+##
+
+import asyncio
+from typing import Union, Tuple, Type, Iterable, Callable, Awaitable, Any
+
+
+class ConcurrencyWindow(object):
+
+    def __init__(self,
+                 limit: int = 16,
+                 adaptive: bool = False,
+                 min_limit: int = 1,
+                 throttle_errors: Tuple[Type[BaseException], ...] = ()):
+        self.max_limit = max(1, limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.adaptive = adaptive
+        self.throttle_errors = throttle_errors
+        self.limit = self.max_limit
+        self.active = 0
+        self.successes = 0
+        self.throttle_count = 0
+        self._condition: Union[asyncio.Condition, None] = None
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.succeeded()
+        elif issubclass(exc_type, self.throttle_errors):
+            self.throttled()
+        await self.release()
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        async with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def throttled(self):
+        self.throttle_count += 1
+        if self.adaptive:
+            self.limit = max(self.min_limit, self.limit // 2)
+            self.successes = 0
+
+    def succeeded(self):
+        if self.adaptive and self.limit < self.max_limit:
+            self.successes += 1
+            if self.successes >= self.limit:
+                self.limit += 1
+                self.successes = 0
+
+
+async def bounded_as_completed(items: Iterable[Any], func: Callable[[Any], Awaitable[Any]], workers: int = 16):
+    queue = asyncio.Queue(maxsize=max(1, workers))
+    source = iter(items)
+
+    async def worker():
+        try:
+            for item in source:
+                result = await func(item)
+                await queue.put((result, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            await queue.put((None, err))
+        await queue.put(None)
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(max(1, workers))]
+    running = len(tasks)
+    try:
+        while running:
+            entry = await queue.get()
+            if entry is None:
+                running -= 1
+                continue
+            result, err = entry
+            if err is not None:
+                raise err
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -3,6 +3,11 @@
 
 import attr
 import json
+from typing import Union, Any, Dict, List
+from restfull.query import Query, Predicate
+from restfull.store import RecordStore
+from restfull.columnar import ColumnStore
+from restfull.spill import SpillStore
 
 
 @attr.s
@@ -24,23 +29,72 @@ class JsonObject:
 
 @attr.s
 class JsonList:
-    data_list: list = attr.ib()
+    data_list: Union[list, RecordStore] = attr.ib()
+    _query: Union[Query, None] = attr.ib(init=False, default=None, repr=False, eq=False)
 
     @property
     def as_list(self) -> list:
+        if isinstance(self.data_list, RecordStore):
+            return self.data_list.as_list()
         return self.data_list
 
     @property
     def as_string(self) -> str:
-        return json.dumps(self.data_list)
+        return json.dumps(self.as_list)
 
     @property
     def formatted(self) -> str:
-        return json.dumps(self.data_list, indent=2)
+        return json.dumps(self.as_list, indent=2)
+
+    @property
+    def is_compact(self) -> bool:
+        return isinstance(self.data_list, ColumnStore)
+
+    def compact(self) -> 'JsonList':
+        if not isinstance(self.data_list, RecordStore):
+            self.data_list = ColumnStore.from_records(self.data_list)
+            self._query = None
+        return self
+
+    @property
+    def is_spilled(self) -> bool:
+        return isinstance(self.data_list, SpillStore)
+
+    def spill(self, directory: Union[str, None] = None) -> 'JsonList':
+        if not isinstance(self.data_list, SpillStore):
+            self.data_list = SpillStore.from_records(self.data_list, directory)
+            self._query = None
+        return self
 
     @property
     def size(self) -> int:
         return len(self.data_list)
 
-    def sorted(self, key: str) -> list:
-        return sorted(self.data_list, key=lambda d: d[key])
+    def query(self) -> Query:
+        if self._query is None or self._query.records is not self.data_list:
+            self._query = Query(self.data_list)
+        return self._query
+
+    def sorted(self, key: str, reverse: bool = False) -> list:
+        if isinstance(self.data_list, RecordStore):
+            return self.data_list.sorted(key, reverse)
+        return self.query().sorted(key, reverse)
+
+    def item(self, index: int) -> Any:
+        try:
+            return self.data_list[index]
+        except IndexError:
+            return None
+
+    def lookup(self, key: str, value: Any) -> list:
+        if isinstance(self.data_list, RecordStore):
+            return self.data_list.lookup(key, value)
+        return self.query().lookup(key, value)
+
+    def where(self, *predicates: Predicate) -> 'JsonList':
+        return JsonList(self.query().where(*predicates))
+
+    def group_by(self, key: str) -> Dict[Any, List[Any]]:
+        if isinstance(self.data_list, RecordStore):
+            return self.data_list.group_by(key)
+        return self.query().group_by(key)
@@ -0,0 +1,94 @@
+##
+##
+
+import os
+import asyncio
+import logging
+import weakref
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Union, Any, Callable
+from restfull.json_backend import JsonLoads
+
+logger = logging.getLogger('restfull.decode')
+logger.addHandler(logging.NullHandler())
+
+
+def select(payload: Any, data_key: Union[str, None] = None, key: Union[str, None] = None, value: Any = None) -> Any:
+    data = payload.get(data_key) if data_key else payload
+    if key is None:
+        return data
+    return [item for item in data or [] if item.get(key) == value]
+
+
+def decode(body: bytes, loads: JsonLoads, data_key: Union[str, None] = None, key: Union[str, None] = None, value: Any = None) -> Any:
+    return select(loads(body), data_key, key, value)
+
+
+class DecodePool(object):
+
+    def __init__(self, workers: Union[int, None] = None, processes: bool = False, max_pending: Union[int, None] = None, min_size: int = 65536):
+        self.workers = workers if workers else min(8, os.cpu_count() or 1)
+        self.processes = processes
+        self.max_pending = max_pending if max_pending else 2 * self.workers
+        self.min_size = min_size
+        self.offloaded = 0
+        self.inline = 0
+        self.lock = threading.Lock()
+        self._executor: Union[Executor, None] = None
+        self.semaphores = weakref.WeakKeyDictionary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def executor(self) -> Executor:
+        with self.lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="restfull-decode")
+                logger.debug(f"Started {'process' if self.processes else 'thread'} decode pool with {self.workers} workers")
+            return self._executor
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return semaphore
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        async with self.semaphore():
+            self.offloaded += 1
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def decode(self, body: bytes, loads: JsonLoads, data_key: Union[str, None] = None, key: Union[str, None] = None, value: Any = None) -> Any:
+        if len(body) < self.min_size:
+            self.inline += 1
+            return decode(body, loads, data_key, key, value)
+        return await self.run(decode, body, loads, data_key, key, value)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "processes": self.processes,
+            "offloaded": self.offloaded,
+            "inline": self.inline
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
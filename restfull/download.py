@@ -0,0 +1,155 @@
+##
+##
+
+import os
+import re
+import asyncio
+import hashlib
+import logging
+from typing import Union, List, Tuple
+from aiohttp import ClientPayloadError, ClientConnectionError
+
+logger = logging.getLogger('restfull.download')
+logger.addHandler(logging.NullHandler())
+content_range_total = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+unsatisfied_range_total = re.compile(r'bytes\s+\*/(\d+)')
+
+
+class Downloader(object):
+
+    def __init__(self,
+                 rest,
+                 chunk_size: int = 1048576,
+                 resume: bool = False,
+                 segments: int = 1,
+                 checksum: Union[str, None] = None,
+                 retries: int = 5):
+        self.rest = rest
+        self.chunk_size = chunk_size
+        self.resume = resume
+        self.segments = max(1, segments)
+        self.checksum = checksum
+        self.retries = retries
+        if checksum is not None:
+            hashlib.new(checksum)
+
+    def hasher(self):
+        return hashlib.new(self.checksum) if self.checksum else None
+
+    def file_digest(self, filename: str) -> Union[str, None]:
+        hasher = self.hasher()
+        if hasher is None:
+            return None
+        with open(filename, 'rb') as fd:
+            for chunk in iter(lambda: fd.read(self.chunk_size), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def restart(self, fd):
+        fd.seek(0)
+        fd.truncate()
+        return self.hasher()
+
+    async def check(self, response):
+        if not self.rest.is_success(response.status):
+            self.rest.validate(response.status, await response.text())
+
+    async def backoff(self, attempt: int, err: Exception):
+        if attempt > self.retries:
+            raise err
+        logger.debug(f"Download interrupted ({err}), resuming, attempt {attempt}")
+        await asyncio.sleep(self.rest.retry_policy.backoff_delay(attempt - 1))
+
+    async def content_length(self, url: str) -> Union[int, None]:
+        session = self.rest.session_async()
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            if response.status != 206:
+                await self.check(response)
+                return None
+            match = content_range_total.match(response.headers.get("Content-Range", ""))
+            return int(match.group(1)) if match else None
+
+    async def fetch(self, endpoint: str, filename: str) -> Union[str, None]:
+        url = self.rest.build_url(endpoint)
+        logger.debug(f"Download from: {url}")
+        if self.segments > 1:
+            size = await self.content_length(url)
+            if size is not None and size >= 2 * self.chunk_size:
+                await self.fetch_segments(url, filename, size)
+                return self.file_digest(filename)
+        return await self.fetch_stream(url, filename)
+
+    async def fetch_stream(self, url: str, filename: str) -> Union[str, None]:
+        offset = os.path.getsize(filename) if self.resume and os.path.exists(filename) else 0
+        hasher = self.hasher()
+        if hasher is not None and offset:
+            with open(filename, 'rb') as fd:
+                for chunk in iter(lambda: fd.read(self.chunk_size), b''):
+                    hasher.update(chunk)
+        session = self.rest.session_async()
+        attempt = 0
+        with open(filename, 'ab' if offset else 'wb') as fd:
+            while True:
+                headers = {"Range": f"bytes={offset}-"} if offset else {}
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        if offset and response.status == 416:
+                            match = unsatisfied_range_total.match(response.headers.get("Content-Range", ""))
+                            if match and int(match.group(1)) == offset:
+                                break
+                            logger.debug(f"Local file size {offset} does not match {url}, restarting download")
+                            hasher = self.restart(fd)
+                            offset = 0
+                            continue
+                        await self.check(response)
+                        if offset and response.status != 206:
+                            logger.debug(f"Server ignored range request, restarting download of {url}")
+                            hasher = self.restart(fd)
+                            offset = 0
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            fd.write(chunk)
+                            offset += len(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                    break
+                except (ClientPayloadError, ClientConnectionError, asyncio.TimeoutError) as err:
+                    fd.flush()
+                    attempt += 1
+                    await self.backoff(attempt, err)
+        return hasher.hexdigest() if hasher is not None else None
+
+    def ranges(self, size: int) -> List[Tuple[int, int]]:
+        step = -(-size // self.segments)
+        return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+    async def fetch_segments(self, url: str, filename: str, size: int):
+        with open(filename, 'wb') as fd:
+            try:
+                os.posix_fallocate(fd.fileno(), 0, size)
+            except (AttributeError, OSError):
+                fd.truncate(size)
+        await asyncio.gather(*[self.fetch_range(url, filename, start, end) for start, end in self.ranges(size)])
+
+    async def fetch_range(self, url: str, filename: str, start: int, end: int):
+        session = self.rest.session_async()
+        position = start
+        attempt = 0
+        with open(filename, 'r+b') as fd:
+            fd.seek(position)
+            while position <= end:
+                received = position
+                try:
+                    async with session.get(url, headers={"Range": f"bytes={position}-{end}"}) as response:
+                        await self.check(response)
+                        if response.status != 206:
+                            raise ValueError(f"Server does not support range requests for {url}")
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            chunk = chunk[:end + 1 - position]
+                            fd.write(chunk)
+                            position += len(chunk)
+                    if position == received:
+                        raise ValueError(f"Server returned an empty range {position}-{end} for {url}")
+                except (ClientPayloadError, ClientConnectionError, asyncio.TimeoutError) as err:
+                    fd.flush()
+                    attempt += 1
+                    await self.backoff(attempt, err)
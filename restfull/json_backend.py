@@ -0,0 +1,56 @@
+##
+##
+
+import json
+from typing import Union, Callable, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+JsonLoads = Callable[[Union[str, bytes]], Any]
+
+
+def stdlib_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+
+def orjson_loads(data: Union[str, bytes]) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+def ujson_loads(data: Union[str, bytes]) -> Any:
+    try:
+        return ujson.loads(data)
+    except ValueError:
+        return json.loads(data)
+
+
+def available_backends() -> list:
+    backends = ["json"]
+    if orjson is not None:
+        backends.append("orjson")
+    if ujson is not None:
+        backends.append("ujson")
+    return backends
+
+
+def json_backend(name: str = "auto") -> JsonLoads:
+    if name == "auto":
+        name = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+    if name == "json":
+        return stdlib_loads
+    elif name == "orjson" and orjson is not None:
+        return orjson_loads
+    elif name == "ujson" and ujson is not None:
+        return ujson_loads
+    raise ValueError(f"JSON backend {name} is not available (available: {', '.join(available_backends())})")
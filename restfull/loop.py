@@ -0,0 +1,87 @@
+##
+##
+
+import asyncio
+import threading
+from typing import Union, Any, Coroutine, AsyncIterator, AsyncGenerator, Iterator, Callable, Awaitable
+
+
+async def shutdown_guard(callback: Callable[[], Awaitable[Any]]):
+    try:
+        yield
+    finally:
+        await callback()
+
+
+def at_shutdown(loop: asyncio.AbstractEventLoop, callback: Callable[[], Awaitable[Any]]) -> AsyncGenerator:
+    guard = shutdown_guard(callback)
+    loop.create_task(guard.__anext__())
+    return guard
+
+
+class LoopThread(object):
+
+    def __init__(self, name: str = "restfull-loop"):
+        self.name = name
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self.thread: Union[threading.Thread, None] = None
+        self.lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self.lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.serve, args=(self._loop,), name=self.name, daemon=True)
+                self.thread.start()
+            return self._loop
+
+    @staticmethod
+    def serve(loop: asyncio.AbstractEventLoop):
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    def in_loop_thread(self) -> bool:
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def run(self, coro: Coroutine, timeout: Union[float, None] = None) -> Any:
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("Synchronous call made from the client event loop thread; await the async method instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, stream: AsyncIterator) -> Iterator:
+        try:
+            while True:
+                try:
+                    item = self.run(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield item
+        finally:
+            self.run(stream.aclose())
+
+    def stop(self):
+        with self.lock:
+            loop, thread = self._loop, self.thread
+            self._loop = None
+            self.thread = None
+        if loop is None or loop.is_closed():
+            return
+        if thread is threading.current_thread():
+            loop.call_soon(loop.stop)
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,186 @@
+##
+##
+
+import math
+import time
+import attr
+import logging
+import threading
+import requests
+from urllib.parse import urlsplit
+from typing import Union, Callable, List, Dict
+
+logger = logging.getLogger('restfull.metrics')
+logger.addHandler(logging.NullHandler())
+
+
+@attr.s
+class RequestMetrics:
+    method: str = attr.ib()
+    url: str = attr.ib()
+    status: Union[int, None] = attr.ib(default=None)
+    dns: Union[float, None] = attr.ib(default=None)
+    connect: Union[float, None] = attr.ib(default=None)
+    tls: Union[float, None] = attr.ib(default=None)
+    ttfb: Union[float, None] = attr.ib(default=None)
+    total: Union[float, None] = attr.ib(default=None)
+    bytes_sent: int = attr.ib(default=0)
+    bytes_received: int = attr.ib(default=0)
+    retries: int = attr.ib(default=0)
+    reused: Union[bool, None] = attr.ib(default=None)
+    error: Union[str, None] = attr.ib(default=None)
+
+    @property
+    def path(self) -> str:
+        return urlsplit(self.url).path
+
+
+MetricsHook = Callable[[RequestMetrics], None]
+
+
+def emit(hooks: List[MetricsHook], metrics: RequestMetrics):
+    for hook in hooks:
+        try:
+            hook(metrics)
+        except Exception as err:
+            logger.debug(f"Metrics hook {hook} failed: {err}")
+
+
+class Histogram(object):
+
+    def __init__(self, precision: float = 0.02, minimum: float = 1e-6):
+        self.growth = math.log1p(precision)
+        self.minimum = minimum
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.lock = threading.Lock()
+
+    def add(self, value: float):
+        index = int(math.log(max(value, self.minimum) / self.minimum) / self.growth)
+        with self.lock:
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> Union[float, None]:
+        with self.lock:
+            if not self.count:
+                return None
+            rank = max(1, math.ceil(self.count * p / 100.0))
+            seen = 0
+            for index in sorted(self.buckets):
+                seen += self.buckets[index]
+                if seen >= rank:
+                    return min(max(self.minimum * math.exp(self.growth * (index + 1)), self.min), self.max)
+            return self.max
+
+    @property
+    def mean(self) -> Union[float, None]:
+        return self.sum / self.count if self.count else None
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        result = {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max}
+        for p in percentiles:
+            result[f"p{p}"] = self.percentile(p)
+        return result
+
+
+class EndpointStats(object):
+
+    def __init__(self):
+        self.timings = {name: Histogram() for name in ("total", "ttfb", "dns", "connect", "tls")}
+        self.status: Dict[int, int] = {}
+        self.count = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.reused = 0
+        self.lock = threading.Lock()
+
+    def add(self, metrics: RequestMetrics):
+        for name, histogram in self.timings.items():
+            value = getattr(metrics, name)
+            if value is not None:
+                histogram.add(value)
+        with self.lock:
+            self.count += 1
+            self.errors += 1 if metrics.error is not None else 0
+            if metrics.status is not None:
+                self.status[metrics.status] = self.status.get(metrics.status, 0) + 1
+            self.bytes_sent += metrics.bytes_sent
+            self.bytes_received += metrics.bytes_received
+            self.retries += metrics.retries
+            self.reused += 1 if metrics.reused else 0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "status": dict(self.status),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "reused": self.reused,
+            "timings": {name: histogram.summary() for name, histogram in self.timings.items() if histogram.count}
+        }
+
+
+class MetricsAggregator(object):
+
+    def __init__(self, key: Union[Callable[[RequestMetrics], str], None] = None):
+        self.key = key if key is not None else lambda m: f"{m.method} {m.path}"
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, metrics: RequestMetrics):
+        key = self.key(metrics)
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+        stats.add(metrics)
+
+    def summary(self) -> dict:
+        with self.lock:
+            endpoints = dict(self.endpoints)
+        return {key: stats.summary() for key, stats in sorted(endpoints.items())}
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+class MetricsSession(requests.Session):
+
+    def __init__(self, hooks: List[MetricsHook]):
+        super().__init__()
+        self.metrics_hooks = hooks
+
+    def send(self, request, **kwargs):
+        if not self.metrics_hooks:
+            return super().send(request, **kwargs)
+        metrics = RequestMetrics(request.method, request.url)
+        body = request.body
+        metrics.bytes_sent = len(body) if isinstance(body, (bytes, str)) else 0
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as err:
+            metrics.total = time.perf_counter() - start
+            metrics.error = type(err).__name__
+            emit(self.metrics_hooks, metrics)
+            raise
+        metrics.total = time.perf_counter() - start
+        metrics.status = response.status_code
+        metrics.ttfb = response.elapsed.total_seconds()
+        metrics.bytes_received = len(response.content) if getattr(response, "_content_consumed", False) else 0
+        for name, value in getattr(response, "timings", {}).items():
+            setattr(metrics, name, value)
+        emit(self.metrics_hooks, metrics)
+        return response
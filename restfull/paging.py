@@ -0,0 +1,214 @@
+##
+##
+
+import asyncio
+from typing import Union, Any, List, Tuple
+from urllib.parse import urlencode, urlsplit
+from requests.utils import parse_header_links
+
+
+def query_endpoint(endpoint: str, params: dict) -> str:
+    separator = '&' if '?' in endpoint else '?'
+    return f"{endpoint}{separator}{urlencode(params)}"
+
+
+def endpoint_from_url(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def path_get(record: Any, path: Union[str, None], default: Any = None) -> Any:
+    if path is None:
+        return record
+    for key in path.split('.'):
+        if not isinstance(record, dict) or key not in record:
+            return default
+        record = record[key]
+    return record
+
+
+def page_info(record: dict, total_tag: str = "total", pages_tag: str = "total_pages", data_key="data", cursor: str = None, category: str = None):
+    data = record.get(data_key)
+    if cursor is not None:
+        record = record.get(cursor, {})
+    if category is not None:
+        record = record.get(category, {})
+    return record.get(total_tag), record.get(pages_tag), data
+
+
+class PageReorderBuffer(object):
+
+    def __init__(self, first_page: int = 1, capacity: Union[int, None] = None):
+        self.next_page = first_page
+        self.capacity = capacity
+        self.pages = {}
+        self.peak = 0
+        self._condition: Union[asyncio.Condition, None] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @property
+    def size(self) -> int:
+        return len(self.pages)
+
+    async def admit(self, page: int):
+        if self.capacity is None:
+            return
+        async with self.condition:
+            await self.condition.wait_for(lambda: page < self.next_page + self.capacity)
+
+    async def put(self, page: int, block: Any) -> List[Any]:
+        self.pages[page] = block
+        self.peak = max(self.peak, len(self.pages))
+        ready = []
+        while self.next_page in self.pages:
+            ready.append(self.pages.pop(self.next_page))
+            self.next_page += 1
+        if ready and self.capacity is not None:
+            async with self.condition:
+                self.condition.notify_all()
+        return ready
+
+
+class Paging(object):
+
+    def __init__(self, data_key: Union[str, None] = "data"):
+        self.data_key = data_key
+
+    def first(self, endpoint: str) -> str:
+        return endpoint
+
+    def data(self, payload: Any) -> Union[list, None]:
+        if self.data_key is None:
+            return payload
+        return payload.get(self.data_key) if isinstance(payload, dict) else None
+
+    def remaining(self, endpoint: str, payload: Any) -> Union[List[Tuple[int, str]], None]:
+        return None
+
+    def next(self, endpoint: str, index: int, payload: Any, headers: Any) -> Union[str, None]:
+        return None
+
+
+class PageNumberPaging(Paging):
+
+    def __init__(self,
+                 page_tag: str = "page",
+                 total_tag: str = "total",
+                 pages_tag: str = "total_pages",
+                 per_page_tag: Union[str, None] = None,
+                 per_page: int = 10,
+                 data_key: Union[str, None] = "data",
+                 cursor: str = None,
+                 category: str = None):
+        super().__init__(data_key)
+        self.page_tag = page_tag
+        self.total_tag = total_tag
+        self.pages_tag = pages_tag
+        self.per_page_tag = per_page_tag
+        self.per_page = per_page
+        self.cursor = cursor
+        self.category = category
+
+    def page(self, endpoint: str, page: int) -> str:
+        params = {self.page_tag: page}
+        if self.per_page_tag:
+            params[self.per_page_tag] = self.per_page
+        return query_endpoint(endpoint, params)
+
+    def first(self, endpoint: str) -> str:
+        return self.page(endpoint, 1)
+
+    def remaining(self, endpoint: str, payload: Any) -> Union[List[Tuple[int, str]], None]:
+        total, pages, _ = page_info(payload, self.total_tag, self.pages_tag, self.data_key, self.cursor, self.category)
+        if pages is None:
+            return None
+        return [(page, self.page(endpoint, page)) for page in range(2, pages + 1)]
+
+    def next(self, endpoint: str, index: int, payload: Any, headers: Any) -> Union[str, None]:
+        return self.page(endpoint, index + 1) if self.data(payload) else None
+
+
+class OffsetLimitPaging(Paging):
+
+    def __init__(self,
+                 offset_tag: str = "offset",
+                 limit_tag: str = "limit",
+                 limit: int = 100,
+                 total_key: Union[str, None] = "total",
+                 data_key: Union[str, None] = "data",
+                 start: int = 0):
+        super().__init__(data_key)
+        self.offset_tag = offset_tag
+        self.limit_tag = limit_tag
+        self.limit = limit
+        self.total_key = total_key
+        self.start = start
+
+    def offset(self, endpoint: str, offset: int) -> str:
+        return query_endpoint(endpoint, {self.offset_tag: offset, self.limit_tag: self.limit})
+
+    def first(self, endpoint: str) -> str:
+        return self.offset(endpoint, self.start)
+
+    def remaining(self, endpoint: str, payload: Any) -> Union[List[Tuple[int, str]], None]:
+        total = path_get(payload, self.total_key) if self.total_key else None
+        if total is None:
+            return None
+        offsets = range(self.start + self.limit, total, self.limit)
+        return [(index, self.offset(endpoint, offset)) for index, offset in enumerate(offsets, start=2)]
+
+    def next(self, endpoint: str, index: int, payload: Any, headers: Any) -> Union[str, None]:
+        data = self.data(payload)
+        if not data or len(data) < self.limit:
+            return None
+        return self.offset(endpoint, self.start + index * self.limit)
+
+
+class CursorPaging(Paging):
+
+    def __init__(self,
+                 cursor_key: str = "next_cursor",
+                 cursor_tag: str = "cursor",
+                 data_key: Union[str, None] = "data",
+                 limit_tag: Union[str, None] = None,
+                 limit: int = 100):
+        super().__init__(data_key)
+        self.cursor_key = cursor_key
+        self.cursor_tag = cursor_tag
+        self.limit_tag = limit_tag
+        self.limit = limit
+
+    def first(self, endpoint: str) -> str:
+        return query_endpoint(endpoint, {self.limit_tag: self.limit}) if self.limit_tag else endpoint
+
+    def next(self, endpoint: str, index: int, payload: Any, headers: Any) -> Union[str, None]:
+        value = path_get(payload, self.cursor_key)
+        if not value:
+            return None
+        value = str(value)
+        if value.startswith('/'):
+            return value
+        if '://' in value:
+            return endpoint_from_url(value)
+        return query_endpoint(self.first(endpoint), {self.cursor_tag: value})
+
+
+class LinkHeaderPaging(Paging):
+
+    def __init__(self, rel: str = "next", data_key: Union[str, None] = None):
+        super().__init__(data_key)
+        self.rel = rel
+
+    def next(self, endpoint: str, index: int, payload: Any, headers: Any) -> Union[str, None]:
+        header = headers.get("Link") if headers else None
+        if not header:
+            return None
+        for link in parse_header_links(header):
+            if link.get("rel") == self.rel and link.get("url"):
+                return endpoint_from_url(link["url"])
+        return None
@@ -0,0 +1,174 @@
+##
+##
+
+import operator
+from typing import Union, Any, Callable, Dict, List, Tuple, Iterable
+from restfull.paging import path_get
+
+
+def value_at(record: Any, path: str) -> Any:
+    if not isinstance(record, dict):
+        return None
+    if path in record:
+        return record[path]
+    return path_get(record, path) if '.' in path else None
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def sort_key(value: Any) -> Tuple[bool, Any]:
+    return value is None, value
+
+
+class Predicate(object):
+
+    def __init__(self, func: Callable[[Any], bool], path: Union[str, None] = None, value: Any = None, equality: bool = False, parts: Tuple['Predicate', ...] = ()):
+        self.func = func
+        self.path = path
+        self.value = value
+        self.equality = equality
+        self.parts = parts
+
+    def __call__(self, record: Any) -> bool:
+        return self.func(record)
+
+    def __and__(self, other: 'Predicate') -> 'Predicate':
+        parts = self.conjuncts() + other.conjuncts()
+        return Predicate(lambda r: all(p(r) for p in parts), parts=parts)
+
+    def __or__(self, other: 'Predicate') -> 'Predicate':
+        return Predicate(lambda r: self(r) or other(r))
+
+    def __invert__(self) -> 'Predicate':
+        return Predicate(lambda r: not self(r))
+
+    def conjuncts(self) -> Tuple['Predicate', ...]:
+        return self.parts if self.parts else (self,)
+
+
+class Field(object):
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def compare(self, op: Callable[[Any, Any], bool], value: Any) -> Predicate:
+        path = self.path
+
+        def check(record: Any) -> bool:
+            item = value_at(record, path)
+            try:
+                return item is not None and op(item, value)
+            except TypeError:
+                return False
+
+        return Predicate(check)
+
+    def eq(self, value: Any) -> Predicate:
+        path = self.path
+        return Predicate(lambda r: value_at(r, path) == value, path, value, equality=True)
+
+    def ne(self, value: Any) -> Predicate:
+        path = self.path
+        return Predicate(lambda r: value_at(r, path) != value)
+
+    def gt(self, value: Any) -> Predicate:
+        return self.compare(operator.gt, value)
+
+    def ge(self, value: Any) -> Predicate:
+        return self.compare(operator.ge, value)
+
+    def lt(self, value: Any) -> Predicate:
+        return self.compare(operator.lt, value)
+
+    def le(self, value: Any) -> Predicate:
+        return self.compare(operator.le, value)
+
+    def isin(self, values: Iterable[Any]) -> Predicate:
+        path = self.path
+        choices = list(values)
+        return Predicate(lambda r: value_at(r, path) in choices)
+
+    def contains(self, value: Any) -> Predicate:
+        return self.compare(lambda item, v: v in item, value)
+
+    def exists(self) -> Predicate:
+        path = self.path
+        return Predicate(lambda r: value_at(r, path) is not None)
+
+    def test(self, func: Callable[[Any], bool]) -> Predicate:
+        path = self.path
+        return Predicate(lambda r: func(value_at(r, path)))
+
+
+def field(path: str) -> Field:
+    return Field(path)
+
+
+def match(**kwargs) -> Predicate:
+    predicate = None
+    for key, value in kwargs.items():
+        term = field(key.replace("__", ".")).eq(value)
+        predicate = term if predicate is None else predicate & term
+    return predicate if predicate is not None else Predicate(lambda r: True)
+
+
+class Query(object):
+
+    def __init__(self, records: List[Any]):
+        self.records = records
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {}
+        self.orders: Dict[Tuple[str, bool], List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def index(self, path: str) -> Dict[Any, List[int]]:
+        index = self.indexes.get(path)
+        if index is None:
+            index = {}
+            for position, record in enumerate(self.records):
+                index.setdefault(freeze(value_at(record, path)), []).append(position)
+            self.indexes[path] = index
+        return index
+
+    def positions(self, path: str, value: Any) -> List[int]:
+        return self.index(path).get(freeze(value), [])
+
+    def lookup(self, path: str, value: Any) -> List[Any]:
+        return [self.records[position] for position in self.positions(path, value)]
+
+    def get(self, path: str, value: Any, default: Any = None) -> Any:
+        positions = self.positions(path, value)
+        return self.records[positions[0]] if positions else default
+
+    def where(self, *predicates: Predicate) -> List[Any]:
+        parts = [part for predicate in predicates for part in predicate.conjuncts()]
+        equalities = [part for part in parts if part.equality]
+        if not equalities:
+            return [record for record in self.records if all(part(record) for part in parts)]
+        candidates = min((self.positions(part.path, part.value) for part in equalities), key=len)
+        rest = [part for part in parts if part is not equalities[0] or len(equalities) > 1]
+        return [self.records[position] for position in candidates if all(part(self.records[position]) for part in rest)]
+
+    def group_by(self, path: str) -> Dict[Any, List[Any]]:
+        return {key: [self.records[position] for position in positions] for key, positions in self.index(path).items()}
+
+    def count_by(self, path: str) -> Dict[Any, int]:
+        return {key: len(positions) for key, positions in self.index(path).items()}
+
+    def sorted(self, path: str, reverse: bool = False) -> List[Any]:
+        order = self.orders.get((path, reverse))
+        if order is None:
+            order = sorted(self.records, key=lambda r: sort_key(value_at(r, path)), reverse=reverse)
+            self.orders[(path, reverse)] = order
+        return list(order)
+
+    def invalidate(self):
+        self.indexes.clear()
+        self.orders.clear()
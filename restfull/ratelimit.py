@@ -0,0 +1,156 @@
+##
+##
+
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Union, Mapping, Dict, List, Tuple
+
+throttle_codes = (429, 503)
+
+
+def retry_after(headers: Mapping[str, str]) -> Union[float, None]:
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def rate_limit_reset(headers: Mapping[str, str]) -> Union[float, None]:
+    value = headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+    if value is None:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1000000000:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def header_number(headers: Mapping[str, str], *names: str) -> Union[float, None]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate: Union[float, None] = None, burst: Union[float, None] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.blocked_until - now)
+            if self.rate:
+                self.refill(now)
+                self.tokens -= 1
+                if self.tokens < 0:
+                    delay = max(delay, -self.tokens / self.rate)
+            return delay
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update(self, limit: Union[float, None], remaining: Union[float, None], reset: Union[float, None]):
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            if limit is not None and self.rate and limit < self.capacity:
+                self.capacity = limit
+            if remaining is not None and self.rate:
+                self.tokens = min(self.tokens, remaining)
+            if remaining is not None and remaining <= 0 and reset:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+
+class RateLimiter(object):
+
+    def __init__(self,
+                 rate: Union[float, None] = None,
+                 burst: Union[float, None] = None,
+                 endpoints: Union[Dict[str, Union[float, Tuple[float, float], TokenBucket]], None] = None):
+        self.bucket = TokenBucket(rate, burst)
+        self.endpoints: List[Tuple[str, TokenBucket]] = []
+        self.delayed = 0
+        self.waited = 0.0
+        self.lock = threading.Lock()
+        for prefix, limit in (endpoints or {}).items():
+            self.add_endpoint(prefix, limit)
+
+    def add_endpoint(self, prefix: str, limit: Union[float, Tuple[float, float], TokenBucket]):
+        if isinstance(limit, TokenBucket):
+            bucket = limit
+        elif isinstance(limit, tuple):
+            bucket = TokenBucket(*limit)
+        else:
+            bucket = TokenBucket(limit)
+        self.endpoints.append((prefix, bucket))
+        self.endpoints.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def buckets(self, path: str) -> List[TokenBucket]:
+        for prefix, bucket in self.endpoints:
+            if path.startswith(prefix):
+                return [self.bucket, bucket]
+        return [self.bucket]
+
+    def reserve(self, path: str) -> float:
+        delay = max(bucket.reserve() for bucket in self.buckets(path))
+        if delay > 0:
+            with self.lock:
+                self.delayed += 1
+                self.waited += delay
+        return delay
+
+    def acquire(self, path: str):
+        delay = self.reserve(path)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, path: str):
+        delay = self.reserve(path)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, path: str, code: int, headers: Mapping[str, str]):
+        buckets = self.buckets(path)
+        bucket = buckets[-1]
+        limit = header_number(headers, "X-RateLimit-Limit", "RateLimit-Limit")
+        remaining = header_number(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+        if limit is not None or remaining is not None:
+            bucket.update(limit, remaining, rate_limit_reset(headers))
+        if code in throttle_codes:
+            delay = retry_after(headers)
+            if delay is None:
+                delay = rate_limit_reset(headers)
+            if delay:
+                bucket.pause(delay)
+
+    def stats(self) -> dict:
+        return {"delayed": self.delayed, "waited": self.waited}
@@ -0,0 +1,116 @@
+##
+##
+
+import attr
+import json
+from typing import Union, Callable, Any
+from requests.structures import CaseInsensitiveDict
+from restfull.data import JsonObject, JsonList
+from restfull.paging import page_info
+from restfull.query import Query, Predicate
+
+
+@attr.s(frozen=True)
+class RestResponse:
+    code: int = attr.ib()
+    content: bytes = attr.ib(repr=False)
+    headers: CaseInsensitiveDict = attr.ib(factory=CaseInsensitiveDict, repr=False)
+    url: Union[str, None] = attr.ib(default=None)
+    data: Union[list, dict] = attr.ib(factory=dict, repr=False)
+    validator: Union[Callable[[int, str], Any], None] = attr.ib(default=None, repr=False, eq=False)
+    encoding: str = attr.ib(default="utf-8", repr=False)
+    loads: Callable[[Union[str, bytes]], Any] = attr.ib(default=json.loads, repr=False, eq=False)
+    cache: dict = attr.ib(init=False, factory=dict, repr=False, eq=False)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def response(self):
+        return self.code, self.text
+
+    def validate(self):
+        if self.validator is not None:
+            self.validator(self.code, self.text)
+        return self
+
+    def parsed_body(self) -> Any:
+        if "body" not in self.cache:
+            self.cache["body"] = self.loads(self.content)
+        return self.cache["body"]
+
+    def json(self, data_key: Union[str, None] = None):
+        try:
+            if data_key is None:
+                return self.parsed_body()
+            else:
+                return self.parsed_body().get(data_key)
+        except (ValueError, AttributeError):
+            return {}
+
+    def as_json(self, data_key: Union[str, None] = None):
+        response = attr.evolve(self, data=self.json(data_key))
+        if "body" in self.cache:
+            response.cache["body"] = self.cache["body"]
+        return response
+
+    def query(self) -> Query:
+        if "query" not in self.cache:
+            self.cache["query"] = Query(self.data if type(self.data) is list else [self.data])
+        return self.cache["query"]
+
+    def filter(self, key: str, value: Any):
+        if type(self.data) is list:
+            return attr.evolve(self, data=self.query().lookup(key, value))
+        return attr.evolve(self, data=self.data if dict(self.data).get(key) == value else {})
+
+    def where(self, *predicates: Predicate):
+        results = self.query().where(*predicates)
+        return attr.evolve(self, data=results if type(self.data) is list else (results[0] if results else {}))
+
+    def group_by(self, key: str) -> dict:
+        return self.query().group_by(key)
+
+    def records(self):
+        if type(self.data) is list:
+            for element in self.data:
+                yield element
+        else:
+            yield self.data
+
+    def record(self):
+        return next(self.records())
+
+    def list(self):
+        return list(self.records())
+
+    def list_item(self, index: int):
+        try:
+            return self.data[index] if type(self.data) is list else [self.data][index]
+        except IndexError:
+            return None
+
+    def json_key(self, key: str):
+        return self.record().get(key)
+
+    def unique(self):
+        if type(self.data) is list and len(self.data) > 1:
+            raise ValueError("More than one object matches search criteria")
+        return self.record()
+
+    def page_count(self, total_tag: str = "total", pages_tag: str = "total_pages", data_key="data", cursor: str = None, category: str = None):
+        return page_info(self.record(), total_tag, pages_tag, data_key, cursor, category)
+
+    def json_object(self) -> JsonObject:
+        return JsonObject(self.data)
+
+    def json_list(self) -> JsonList:
+        return JsonList(self.data)
+
+    @property
+    def is_present(self) -> bool:
+        return bool(self.data)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.data
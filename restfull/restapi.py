@@ -3,17 +3,37 @@
 
 import certifi
 import logging
-import json
-import requests
 import warnings
 import asyncio
+import time
 import ssl
+import weakref
+from contextlib import nullcontext
 from restfull.base_auth import RestAuthBase
 from restfull.data import JsonObject, JsonList
-from typing import Union, IO
-from requests.adapters import HTTPAdapter, Retry
-from aiohttp import ClientSession, TCPConnector
-from pytoolbase.retry import retry
+from restfull.query import Query, Predicate
+from restfull.store import RecordStore
+from restfull.columnar import ColumnStore
+from restfull.spill import SpillStore
+from restfull.decode import DecodePool, select
+from restfull.concurrency import ConcurrencyWindow, bounded_as_completed
+from restfull.paging import PageReorderBuffer, Paging, PageNumberPaging, page_info
+from restfull.batch import BatchRequest, BatchResult, ProgressCallback
+from restfull.response import RestResponse
+from restfull.adapter import PooledHTTPAdapter, PoolStats, TimedTCPConnector, retries_disabled, tls_time
+from restfull.json_backend import json_backend as get_json_backend
+from restfull.download import Downloader
+from restfull.upload import upload_body, upload_body_async, iter_ndjson, rewindable
+from restfull.stream_json import JsonStreamParser
+from restfull.cache import ResponseCache, CacheEntry, UNPARSED, request_key
+from restfull.singleflight import SingleFlight, AsyncSingleFlight
+from restfull.ratelimit import RateLimiter, retry_after
+from restfull.retry import RetryPolicy, retry_async, retry_attempt
+from restfull.loop import LoopThread, at_shutdown
+from restfull.metrics import RequestMetrics, MetricsAggregator, MetricsSession, MetricsHook, emit
+from typing import Union, IO, Iterable, Tuple, Any, List, Dict, Coroutine
+from requests.structures import CaseInsensitiveDict
+from aiohttp import ClientSession, TraceConfig
 from pytoolbase.exceptions import NonFatalError
 
 warnings.filterwarnings("ignore")
@@ -56,6 +76,44 @@ class NonRetryableError(NonFatalError):
     pass
 
 
+fatal_errors = (BadRequestError, PermissionDeniedError, NotFoundError, UnprocessableEntityError, InternalServerError, NonRetryableError)
+
+
+def not_processed(err: BaseException) -> bool:
+    return getattr(err, "status", None) in (429, 503) and getattr(err, "retry_after", None) is not None
+
+
+def close_session(loop: asyncio.AbstractEventLoop, session: ClientSession):
+    if session.closed:
+        return
+    if loop.is_closed():
+        session.detach()
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+    else:
+        try:
+            asyncio.get_running_loop()
+            session.detach()
+        except RuntimeError:
+            loop.run_until_complete(session.close())
+
+
+def close_sessions(loop_thread: LoopThread, sessions: Dict[asyncio.AbstractEventLoop, ClientSession], guards: Dict[asyncio.AbstractEventLoop, Any]):
+    if loop_thread.running:
+        loop = loop_thread.loop
+        session = sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            if loop_thread.in_loop_thread():
+                loop.create_task(session.close())
+            else:
+                loop_thread.run(session.close())
+        loop_thread.stop()
+    for loop, session in list(sessions.items()):
+        close_session(loop, session)
+    sessions.clear()
+    guards.clear()
+
+
 class RestAPI(object):
 
     def __init__(self,
@@ -63,15 +121,39 @@ class RestAPI(object):
                  hostname: str = '127.0.0.1',
                  use_ssl: bool = True,
                  verify: bool = True,
-                 port: Union[int, None] = None):
+                 port: Union[int, None] = None,
+                 pool_limit: int = 100,
+                 pool_limit_per_host: int = 0,
+                 keepalive_timeout: float = 15.0,
+                 dns_cache_ttl: Union[int, None] = 10,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 tcp_keepalive: Union[int, None] = None,
+                 json_backend: str = "auto",
+                 cache: Union[ResponseCache, None] = None,
+                 coalesce: bool = True,
+                 rate_limiter: Union[RateLimiter, None] = None,
+                 retry_policy: Union[RetryPolicy, None] = None,
+                 decode_pool: Union[DecodePool, None] = None):
         self.hostname = hostname
         self.auth_class = auth_class
         self.ssl = use_ssl
         self.verify = verify
         self.port = port
         self.scheme = 'https' if self.ssl else 'http'
+        self.json_loads = get_json_backend(json_backend)
+        self.cache = cache
+        self.coalesce = coalesce
+        self.flight = SingleFlight()
+        self.flight_async = AsyncSingleFlight()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.decode_pool = decode_pool
+        self.metrics_hooks: List[MetricsHook] = []
         self.response_text = None
         self.response_content = None
+        self._query: Union[Query, None] = None
         self.response_dict: Union[list, dict] = {}
         self.response_code = 200
         self.success_start = 200
@@ -83,21 +165,31 @@ class RestAPI(object):
         self.rate_limit_code = 429
         self.server_error_code = 500
         self._retry_server_errors = False
-        try:
-            self.loop = asyncio.get_event_loop()
-        except RuntimeError:
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._sessions_async: Dict[asyncio.AbstractEventLoop, ClientSession] = {}
+        self._session_guards: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self.loop_thread = LoopThread()
+        self._finalizer = weakref.finalize(self, close_sessions, self.loop_thread, self._sessions_async, self._session_guards)
 
         self.ssl_context = ssl.create_default_context()
         self.ssl_context.load_verify_locations(certifi_where)
 
         self.request_headers = self.auth_class.get_header()
-        self.session = requests.Session()
-        retries = Retry(total=10,
-                        backoff_factor=0.01)
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.session = MetricsSession(self.metrics_hooks)
+        self.pool_stats = PoolStats()
+        self.adapter = PooledHTTPAdapter(self.pool_stats,
+                                         tcp_keepalive,
+                                         rate_limiter,
+                                         pool_connections=pool_connections,
+                                         pool_maxsize=pool_maxsize,
+                                         pool_block=pool_block,
+                                         max_retries=self.retry_policy.urllib3_retry())
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
 
         if not port:
             if use_ssl:
@@ -107,6 +199,283 @@ class RestAPI(object):
 
         self.url_prefix = f"{self.scheme}://{self.hostname}:{self.port}"
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_async()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            try:
+                self._loop = asyncio.get_event_loop()
+            except RuntimeError:
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+        return self._loop
+
+    def run_sync(self, coro: Coroutine, timeout: Union[float, None] = None) -> Any:
+        return self.loop_thread.run(coro, timeout)
+
+    def prune_sessions(self):
+        for loop, session in list(self._sessions_async.items()):
+            if loop.is_closed():
+                close_session(loop, session)
+                del self._sessions_async[loop]
+                self._session_guards.pop(loop, None)
+
+    def session_async(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        self.prune_sessions()
+        session = self._sessions_async.get(loop)
+        if session is None or session.closed:
+            conn = TimedTCPConnector(ssl=self.ssl_context if self.verify else False,
+                                limit=self.pool_limit,
+                                limit_per_host=self.pool_limit_per_host,
+                                keepalive_timeout=self.keepalive_timeout,
+                                use_dns_cache=self.dns_cache_ttl is not None,
+                                ttl_dns_cache=self.dns_cache_ttl)
+            session = ClientSession(headers=self.request_headers, connector=conn, trace_configs=[self.trace_config()])
+            self._sessions_async[loop] = session
+            if not self.loop_thread.in_loop_thread():
+                self._session_guards[loop] = at_shutdown(loop, session.close)
+        return session
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        owner = weakref.proxy(self)
+
+        def finish(context):
+            metrics = context.metrics
+            metrics.total = time.perf_counter() - context.start
+            emit(owner.metrics_hooks, metrics)
+
+        async def on_request_start(session, context, params):
+            if owner.rate_limiter is not None:
+                await owner.rate_limiter.acquire_async(params.url.path)
+            context.metrics = RequestMetrics(params.method, str(params.url), retries=retry_attempt.get()) if owner.metrics_hooks else None
+            context.start = time.perf_counter()
+
+        async def on_dns_resolvehost_start(session, context, params):
+            context.dns_start = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session, context, params):
+            if context.metrics is not None:
+                context.metrics.dns = time.perf_counter() - context.dns_start
+
+        async def on_connection_create_start(session, context, params):
+            context.connect_start = time.perf_counter()
+
+        async def on_connection_create_end(session, context, params):
+            if context.metrics is not None:
+                context.metrics.tls = tls_time.get()
+                context.metrics.connect = time.perf_counter() - context.connect_start - (context.metrics.dns or 0.0) - (context.metrics.tls or 0.0)
+                context.metrics.reused = False
+
+        async def on_connection_reuseconn(session, context, params):
+            if context.metrics is not None:
+                context.metrics.reused = True
+
+        async def on_request_chunk_sent(session, context, params):
+            if context.metrics is not None:
+                context.metrics.bytes_sent += len(params.chunk)
+
+        async def on_request_end(session, context, params):
+            if owner.rate_limiter is not None:
+                owner.rate_limiter.update(params.url.path, params.response.status, params.response.headers)
+            if context.metrics is not None:
+                context.metrics.status = params.response.status
+                context.metrics.ttfb = time.perf_counter() - context.start
+                content = params.response.content
+
+                def on_eof():
+                    context.metrics.bytes_received = content.total_bytes
+                    finish(context)
+
+                content.on_eof(on_eof)
+
+        async def on_request_exception(session, context, params):
+            if context.metrics is not None:
+                context.metrics.error = type(params.exception).__name__
+                finish(context)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    def close_loop_thread(self):
+        if self.loop_thread.running and not self.loop_thread.in_loop_thread():
+            session = self._sessions_async.pop(self.loop_thread.loop, None)
+            if session is not None and not session.closed:
+                self.loop_thread.run(session.close())
+            self.loop_thread.stop()
+
+    async def close_async(self):
+        self.session.close()
+        loop = asyncio.get_running_loop()
+        session = self._sessions_async.pop(loop, None)
+        self._session_guards.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+        if self.loop_thread.in_loop_thread():
+            close_sessions(self.loop_thread, self._sessions_async, self._session_guards)
+        else:
+            await loop.run_in_executor(None, close_sessions, self.loop_thread, self._sessions_async, self._session_guards)
+
+    def close(self):
+        self.session.close()
+        close_sessions(self.loop_thread, self._sessions_async, self._session_guards)
+
+    @property
+    def response_dict(self) -> Union[list, dict]:
+        return self._response_dict
+
+    @response_dict.setter
+    def response_dict(self, value: Union[list, dict]):
+        self._response_dict = value
+        self._query = None
+
+    @property
+    def is_list(self) -> bool:
+        return isinstance(self._response_dict, (list, RecordStore))
+
+    def query(self) -> Query:
+        if self._query is None:
+            self._query = Query(self.response_dict if self.is_list else [self.response_dict])
+        return self._query
+
+    @property
+    def response_text(self) -> Union[str, None]:
+        if self._response_text is None and self._response_body is not None:
+            self._response_text = self._response_body.decode(self._response_encoding or "utf-8", errors="replace")
+        return self._response_text
+
+    @response_text.setter
+    def response_text(self, value: Union[str, None]):
+        self._response_text = value
+        self._response_body = None
+        self._response_encoding = None
+        self._parsed = UNPARSED
+        self._cache_entry = None
+
+    def set_response_body(self, body: bytes, encoding: Union[str, None] = None, parsed: Any = UNPARSED, entry: Union[CacheEntry, None] = None):
+        self._response_text = None
+        self._response_body = body
+        self._response_encoding = encoding
+        self._parsed = self.cache.parsed(entry) if entry is not None and self.cache is not None and parsed is UNPARSED else parsed
+        self._cache_entry = entry
+
+    def parsed_body(self) -> Any:
+        if self._parsed is UNPARSED:
+            self._parsed = self.json_loads(self._response_body if self._response_body is not None else self.response_text)
+            if self._cache_entry is not None and self.cache is not None:
+                self.cache.keep_parsed(self._cache_entry, self._parsed)
+        return self._parsed
+
+    def set_cache(self, cache: Union[ResponseCache, None]):
+        self.cache = cache
+
+    def set_decode_pool(self, decode_pool: Union[DecodePool, None]):
+        self.decode_pool = decode_pool
+
+    def set_rate_limiter(self, rate_limiter: Union[RateLimiter, None]):
+        self.rate_limiter = rate_limiter
+        self.adapter.rate_limiter = rate_limiter
+
+    def add_metrics_hook(self, hook: Union[MetricsHook, None] = None) -> MetricsHook:
+        hook = hook if hook is not None else MetricsAggregator()
+        self.metrics_hooks.append(hook)
+        return hook
+
+    def remove_metrics_hook(self, hook: MetricsHook):
+        self.metrics_hooks.remove(hook)
+
+    def set_retry_policy(self, retry_policy: RetryPolicy):
+        self.retry_policy = retry_policy
+        self.adapter.max_retries = retry_policy.urllib3_retry()
+
+    def set_coalesce(self, enabled: bool = True):
+        self.coalesce = enabled
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats.as_dict() if self.cache is not None else {}
+
+    def coalesced_count(self) -> int:
+        return self.flight.coalesced + self.flight_async.coalesced
+
+    def cached_get(self, url: str) -> Tuple[int, bytes, Union[str, None], Any, Union[CacheEntry, None]]:
+        if self.coalesce:
+            return self.flight.do(request_key(url, self.request_headers), lambda: self._cached_get(url))
+        return self._cached_get(url)
+
+    def _cached_get(self, url: str) -> Tuple[int, bytes, Union[str, None], Any, Union[CacheEntry, None]]:
+        key = entry = None
+        headers = {}
+        if self.cache is not None:
+            key = self.cache.key(url, self.request_headers)
+            entry, fresh = self.cache.lookup(key)
+            if fresh:
+                return entry.code, entry.body, entry.encoding, CaseInsensitiveDict(entry.headers), entry
+            headers = self.cache.conditional_headers(entry)
+        response = self.session.get(url, auth=self.auth_class, headers=headers, verify=self.verify)
+        if key is not None:
+            entry = self.cache.update(key, entry, url, response.status_code, response.content, response.encoding, response.headers)
+            if entry is not None:
+                return entry.code, entry.body, entry.encoding, CaseInsensitiveDict(entry.headers), entry
+        return response.status_code, response.content, response.encoding, response.headers, None
+
+    def set_get_response(self, code: int, body: bytes, encoding: Union[str, None], entry: Union[CacheEntry, None] = None):
+        self.set_response_body(body, encoding, entry=entry)
+        self.response_code = code
+
+    async def cached_get_async(self, url: str) -> Tuple[int, bytes, Union[str, None], Any, Union[CacheEntry, None]]:
+        if self.coalesce:
+            return await self.flight_async.do(request_key(url, self.request_headers), lambda: self._cached_get_async(url))
+        return await self._cached_get_async(url)
+
+    async def _cached_get_async(self, url: str) -> Tuple[int, bytes, Union[str, None], Any, Union[CacheEntry, None]]:
+        key = entry = None
+        headers = {}
+        if self.cache is not None:
+            key = self.cache.key(url, self.request_headers)
+            entry, fresh = self.cache.lookup(key)
+            if fresh:
+                return entry.code, entry.body, entry.encoding, CaseInsensitiveDict(entry.headers), entry
+            headers = self.cache.conditional_headers(entry)
+        session = self.session_async()
+        async with session.get(url, headers=headers) as response:
+            body = await response.read()
+            code, encoding, response_headers = response.status, response.charset, response.headers
+        if key is not None:
+            entry = self.cache.update(key, entry, url, code, body, encoding, response_headers)
+            if entry is not None:
+                return entry.code, entry.body, entry.encoding, CaseInsensitiveDict(entry.headers), entry
+        return code, body, encoding, response_headers, None
+
+    def set_json_backend(self, name: str):
+        self.json_loads = get_json_backend(name)
+        self._parsed = UNPARSED
+
+    def is_success(self, code: int) -> bool:
+        return self.success_start <= code < self.success_end
+
+    def connection_stats(self) -> dict:
+        return self.pool_stats.as_dict()
+
     def set_success_range(self, start: int, end: int):
         self.success_start = start
         self.success_end = end
@@ -130,18 +499,17 @@ class RestAPI(object):
         url = self.build_url(endpoint)
         self.reset()
         logger.debug(f"GET {url}")
-        response = self.session.get(url, auth=self.auth_class, verify=self.verify)
-        self.response_text = response.text
-        self.response_code = response.status_code
+        code, body, encoding, _, entry = self.cached_get(url)
+        self.set_get_response(code, body, encoding, entry)
         return self
 
     def get_bytes(self, endpoint: str):
         url = self.build_url(endpoint)
         self.reset()
         logger.debug(f"GET {url}")
-        response = self.session.get(url, auth=self.auth_class, verify=self.verify)
-        self.response_content = response.content
-        self.response_code = response.status_code
+        code, body, encoding, _, entry = self.cached_get(url)
+        self.set_get_response(code, body, encoding, entry)
+        self.response_content = body
         return self
 
     def get_by_page(self, endpoint: str, page_tag: str = "page", page: int = 1, per_page_tag: Union[str, None] = None, per_page: int = 10):
@@ -149,9 +517,8 @@ class RestAPI(object):
         url = self.build_url(_endpoint)
         self.reset()
         logger.debug(f"GET {url}")
-        response = self.session.get(url, auth=self.auth_class, verify=self.verify)
-        self.response_text = response.text
-        self.response_code = response.status_code
+        code, body, encoding, _, entry = self.cached_get(url)
+        self.set_get_response(code, body, encoding, entry)
         return self
 
     def post(self, endpoint: str, body: dict):
@@ -159,7 +526,7 @@ class RestAPI(object):
         self.reset()
         logger.debug(f"POST {url}")
         response = self.session.post(url, auth=self.auth_class, json=body, verify=self.verify)
-        self.response_text = response.text
+        self.set_response_body(response.content, response.encoding)
         self.response_code = response.status_code
         return self
 
@@ -168,7 +535,7 @@ class RestAPI(object):
         self.reset()
         logger.debug(f"PATCH {url}")
         response = self.session.patch(url, auth=self.auth_class, json=body, verify=self.verify)
-        self.response_text = response.text
+        self.set_response_body(response.content, response.encoding)
         self.response_code = response.status_code
         return self
 
@@ -177,7 +544,7 @@ class RestAPI(object):
         self.reset()
         logger.debug(f"PUT {url}")
         response = self.session.put(url, auth=self.auth_class, json=body, verify=self.verify)
-        self.response_text = response.text
+        self.set_response_body(response.content, response.encoding)
         self.response_code = response.status_code
         return self
 
@@ -186,17 +553,95 @@ class RestAPI(object):
         self.reset()
         logger.debug(f"DELETE {url}")
         response = self.session.delete(url, auth=self.auth_class, verify=self.verify)
-        self.response_text = response.text
+        self.set_response_body(response.content, response.encoding)
+        self.response_code = response.status_code
+        return self
+
+    def upload(self, endpoint: str, source: Any, method: str = "POST", content_type: str = "application/octet-stream"):
+        url = self.build_url(endpoint)
+        self.reset()
+        logger.debug(f"{method.upper()} {url} (upload)")
+        with upload_body(source) as data, nullcontext() if rewindable(data) else retries_disabled():
+            response = self.session.request(method.upper(), url, auth=self.auth_class, data=data, headers={"Content-Type": content_type}, verify=self.verify)
+        self.set_response_body(response.content, response.encoding)
         self.response_code = response.status_code
         return self
 
+    def upload_ndjson(self, endpoint: str, records: Iterable[Any], method: str = "POST", chunk_size: int = 1048576):
+        return self.upload(endpoint, iter_ndjson(records, chunk_size), method, "application/x-ndjson")
+
+    async def upload_async(self, endpoint: str, source: Any, method: str = "POST", content_type: str = "application/octet-stream", chunk_size: int = 1048576):
+        url = self.build_url(endpoint)
+        self.reset()
+        logger.debug(f"{method.upper()} {url} (upload)")
+        session = self.session_async()
+        with upload_body_async(source, chunk_size) as data:
+            async with session.request(method.upper(), url, data=data, headers={"Content-Type": content_type}) as response:
+                self.set_response_body(await response.read(), response.charset)
+                self.response_code = response.status
+        return self
+
+    async def upload_ndjson_async(self, endpoint: str, records: Iterable[Any], method: str = "POST", chunk_size: int = 1048576):
+        return await self.upload_async(endpoint, iter_ndjson(records, chunk_size), method, "application/x-ndjson", chunk_size)
+
+    def stream_records(self, endpoint: str, data_key: Union[str, None] = None, ndjson: bool = False, chunk_size: int = 65536):
+        url = self.build_url(endpoint)
+        logger.debug(f"GET {url} (stream)")
+        parser = JsonStreamParser(data_key, ndjson, self.json_loads)
+        with self.session.get(url, auth=self.auth_class, verify=self.verify, stream=True) as response:
+            self.response_code = response.status_code
+            if not self.is_success(response.status_code):
+                self.validate(response.status_code, response.text)
+            for chunk in response.iter_content(chunk_size):
+                for record in parser.feed(chunk):
+                    yield record
+        for record in parser.close():
+            yield record
+
+    async def aiter_records(self, endpoint: str, data_key: Union[str, None] = None, ndjson: bool = False, chunk_size: int = 65536):
+        url = self.build_url(endpoint)
+        logger.debug(f"GET {url} (stream)")
+        parser = JsonStreamParser(data_key, ndjson, self.json_loads)
+        session = self.session_async()
+        async with session.get(url) as response:
+            self.response_code = response.status
+            if not self.is_success(response.status):
+                self.validate(response.status, await response.text())
+            async for chunk in response.content.iter_chunked(chunk_size):
+                for record in parser.feed(chunk):
+                    yield record
+        for record in parser.close():
+            yield record
+
+    def send(self, method: str, endpoint: str, body: Union[dict, None] = None) -> RestResponse:
+        url = self.build_url(endpoint)
+        logger.debug(f"{method.upper()} {url}")
+        if method.upper() == "GET" and body is None:
+            code, content, encoding, headers, _ = self.cached_get(url)
+            return RestResponse(code, content, CaseInsensitiveDict(headers), url, validator=self.validate, encoding=encoding or "utf-8", loads=self.json_loads)
+        response = self.session.request(method.upper(), url, auth=self.auth_class, json=body, verify=self.verify)
+        return RestResponse(response.status_code, response.content, CaseInsensitiveDict(response.headers), url, validator=self.validate, encoding=response.encoding or "utf-8",
+                            loads=self.json_loads)
+
+    async def send_async(self, method: str, endpoint: str, body: Union[dict, None] = None) -> RestResponse:
+        url = self.build_url(endpoint)
+        logger.debug(f"{method.upper()} {url}")
+        if method.upper() == "GET" and body is None:
+            code, content, encoding, headers, _ = await self.cached_get_async(url)
+            return RestResponse(code, content, CaseInsensitiveDict(headers), url, validator=self.validate, encoding=encoding or "utf-8", loads=self.json_loads)
+        session = self.session_async()
+        async with session.request(method.upper(), url, json=body) as response:
+            content = await response.read()
+            return RestResponse(response.status, content, CaseInsensitiveDict(response.headers), url, validator=self.validate, encoding=response.charset or "utf-8", loads=self.json_loads)
+
     def validate(self, code: int = None, text: str = None):
         check_code = code if code is not None else self.response_code
-        check_text = text if text is not None else self.response_text
-        logger.debug(f"Validating return code {check_code}: {check_text}")
         if self.success_start <= check_code < self.success_end:
+            logger.debug(f"Validating return code {check_code}")
             return self
-        elif check_code == self.bad_request_code:
+        check_text = text if text is not None else self.response_text
+        logger.debug(f"Validating return code {check_code}: {check_text}")
+        if check_code == self.bad_request_code:
             raise BadRequestError(check_text)
         elif check_code == self.permission_denied_code:
             raise PermissionDeniedError(check_text)
@@ -221,13 +666,21 @@ class RestAPI(object):
         else:
             raise RuntimeError(f"unknown response code: {check_code} response: {check_text}")
 
+    def check_response(self, code: int, text: str, headers: Any):
+        try:
+            return self.validate(code, text)
+        except NonFatalError as err:
+            err.status = code
+            err.retry_after = retry_after(headers)
+            raise
+
     def json(self, data_key: Union[str, None] = None):
         try:
             if data_key is None:
-                return json.loads(self.response_text)
+                return self.parsed_body()
             else:
-                return json.loads(self.response_text).get(data_key)
-        except (json.decoder.JSONDecodeError, AttributeError):
+                return self.parsed_body().get(data_key)
+        except (ValueError, TypeError, AttributeError):
             return {}
 
     def text(self):
@@ -240,25 +693,30 @@ class RestAPI(object):
         return self.response_code, self.response_text
 
     def as_json(self, data_key: Union[str, None] = None):
-        try:
-            if data_key is None:
-                self.response_dict = json.loads(self.response_text)
-            else:
-                self.response_dict = json.loads(self.response_text).get(data_key)
-        except (json.decoder.JSONDecodeError, AttributeError):
-            self.response_dict = {}
+        self.response_dict = self.json(data_key)
         return self
 
-    def filter(self, key: str, value: str):
-        if type(self.response_dict) is list:
-            self.response_dict = [item for item in self.response_dict if item.get(key) == value]
+    def filter(self, key: str, value: Any):
+        if self.is_list:
+            self.response_dict = self.query().lookup(key, value)
         else:
             self.response_dict = self.response_dict if dict(self.response_dict).get(key) == value else {}
         return self
 
+    def where(self, *predicates: Predicate):
+        results = self.query().where(*predicates)
+        self.response_dict = results if self.is_list else (results[0] if results else {})
+        return self
+
+    def lookup(self, key: str, value: Any) -> list:
+        return self.query().lookup(key, value)
+
+    def group_by(self, key: str) -> dict:
+        return self.query().group_by(key)
+
     def list_item(self, index: int):
         try:
-            return list(self.records())[index]
+            return self.response_dict[index] if self.is_list else [self.response_dict][index]
         except IndexError:
             return None
 
@@ -270,7 +728,7 @@ class RestAPI(object):
         return record.get(key)
 
     def records(self):
-        if type(self.response_dict) is list:
+        if self.is_list:
             for element in self.response_dict:
                 yield element
         else:
@@ -280,24 +738,23 @@ class RestAPI(object):
         return next(self.records())
 
     def unique(self):
-        if type(self.response_dict) is list and len(self.response_dict) > 1:
+        if self.is_list and len(self.response_dict) > 1:
             raise ValueError("More than one object matches search criteria")
         return self.record()
 
     def page_count(self, total_tag: str = "total", pages_tag: str = "total_pages", data_key="data", cursor: str = None, category: str = None):
-        record = self.record()
-        data = record.get(data_key)
-        if cursor is not None:
-            record = record.get(cursor, {})
-        if category is not None:
-            record = record.get(category, {})
-        return record.get(total_tag), record.get(pages_tag), data
+        return self.page_info(self.record(), total_tag, pages_tag, data_key, cursor, category)
+
+    @staticmethod
+    def page_info(record: dict, total_tag: str = "total", pages_tag: str = "total_pages", data_key="data", cursor: str = None, category: str = None):
+        return page_info(record, total_tag, pages_tag, data_key, cursor, category)
 
     def json_object(self) -> JsonObject:
         return JsonObject(self.response_dict)
 
-    def json_list(self) -> JsonList:
-        return JsonList(self.response_dict)
+    def json_list(self, compact: bool = False) -> JsonList:
+        data = JsonList(self.response_dict)
+        return data.compact() if compact else data
 
     async def get_paged_endpoint(self,
                                  endpoint: str,
@@ -308,19 +765,18 @@ class RestAPI(object):
                                  per_page: int = 10,
                                  data_key="data",
                                  cursor: str = None,
-                                 category: str = None):
-        total, pages, data = self.get_by_page(endpoint, page_tag, 1, per_page_tag, per_page).validate().as_json().page_count(total_tag, pages_tag, data_key, cursor, category)
-
-        if pages > 1:
-            for result in asyncio.as_completed([self.get_data_async(self.paged_endpoint(endpoint, page_tag, page, per_page_tag, per_page),
-                                                                    data_key=data_key) for page in range(2, pages + 1)]):
-                try:
-                    block = await result
-                    if block:
-                        data.extend(block)
-                except Exception:
-                    raise
-
+                                 category: str = None,
+                                 concurrency: int = 16,
+                                 adaptive: bool = False,
+                                 ordered: bool = False,
+                                 paging: Union[Paging, None] = None,
+                                 compact: bool = False,
+                                 spill: bool = False,
+                                 spill_dir: Union[str, None] = None):
+        data = SpillStore(spill_dir, self.json_loads) if spill else ColumnStore() if compact else []
+        async for block in self.aiter_paged(endpoint, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category,
+                                            concurrency, adaptive, ordered, blocks=True, paging=paging):
+            data.extend(block)
         return data
 
     def get_paged(self,
@@ -332,16 +788,215 @@ class RestAPI(object):
                   per_page: int = 10,
                   data_key="data",
                   cursor: str = None,
-                  category: str = None):
+                  category: str = None,
+                  concurrency: int = 16,
+                  adaptive: bool = False,
+                  ordered: bool = False,
+                  paging: Union[Paging, None] = None,
+                  compact: bool = False,
+                  spill: bool = False,
+                  spill_dir: Union[str, None] = None):
         try:
-            self.response_dict = self.loop.run_until_complete(self.get_paged_endpoint(endpoint, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category))
+            self.response_dict = self.run_sync(self.get_paged_endpoint(endpoint, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category,
+                                                                       concurrency, adaptive, ordered, paging, compact, spill, spill_dir))
             return self
         except Exception:
             raise
 
-    def download(self, endpoint: str, filename: str):
-        with open(filename, 'wb') as fd:
-            self.loop.run_until_complete(self.write_stream_async(endpoint, fd))
+    async def aiter_paged(self,
+                          endpoint: str,
+                          page_tag: str = "page",
+                          total_tag: str = "total",
+                          pages_tag: str = "total_pages",
+                          per_page_tag: str = None,
+                          per_page: int = 10,
+                          data_key="data",
+                          cursor: str = None,
+                          category: str = None,
+                          concurrency: int = 16,
+                          adaptive: bool = False,
+                          ordered: bool = False,
+                          blocks: bool = False,
+                          paging: Union[Paging, None] = None):
+        if paging is None:
+            paging = PageNumberPaging(page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category)
+        stream = self.aiter_pages(endpoint, paging, concurrency, adaptive, ordered)
+        try:
+            async for block in stream:
+                for item in ([block] if blocks else block):
+                    yield item
+        finally:
+            await stream.aclose()
+
+    async def aiter_pages(self, endpoint: str, paging: Paging, concurrency: int = 16, adaptive: bool = False, ordered: bool = False, predicate: Union[Predicate, None] = None):
+        current = paging.first(endpoint)
+        payload, headers = await self.get_json_async(current)
+        remaining = paging.remaining(endpoint, payload)
+
+        if remaining is None:
+            index = 1
+            prefetch = None
+            try:
+                while True:
+                    next_endpoint = paging.next(endpoint, index, payload, headers)
+                    if next_endpoint == current:
+                        next_endpoint = None
+                    prefetch = asyncio.ensure_future(self.get_json_async(next_endpoint)) if next_endpoint else None
+                    block = self.keep(paging.data(payload), predicate)
+                    del payload
+                    if block:
+                        yield block
+                    if prefetch is None:
+                        break
+                    payload, headers = await prefetch
+                    prefetch = None
+                    current = next_endpoint
+                    index += 1
+            finally:
+                if prefetch is not None:
+                    prefetch.cancel()
+            return
+
+        block = self.keep(paging.data(payload), predicate)
+        del payload
+        if block:
+            yield block
+
+        if remaining:
+            reorder = PageReorderBuffer(2, 2 * concurrency) if ordered else None
+            pages = self.get_pages_async(remaining, paging.data_key, concurrency, adaptive, reorder, predicate)
+            try:
+                async for page, block in pages:
+                    for ready in (await reorder.put(page, block) if reorder else [block]):
+                        if ready:
+                            yield ready
+            finally:
+                await pages.aclose()
+
+    @staticmethod
+    def keep(block: Union[list, None], predicate: Union[Predicate, None] = None) -> Union[list, None]:
+        if predicate is None or not block:
+            return block
+        return [record for record in block if predicate(record)]
+
+    async def aiter_search(self,
+                           endpoint: str,
+                           predicate: Predicate,
+                           page_tag: str = "page",
+                           total_tag: str = "total",
+                           pages_tag: str = "total_pages",
+                           per_page_tag: str = None,
+                           per_page: int = 10,
+                           data_key="data",
+                           cursor: str = None,
+                           category: str = None,
+                           concurrency: int = 16,
+                           adaptive: bool = False,
+                           ordered: bool = False,
+                           paging: Union[Paging, None] = None,
+                           limit: Union[int, None] = None):
+        if paging is None:
+            paging = PageNumberPaging(page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category)
+        stream = self.aiter_pages(endpoint, paging, concurrency, adaptive, ordered, predicate)
+        found = 0
+        try:
+            async for block in stream:
+                for record in block:
+                    yield record
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+        finally:
+            await stream.aclose()
+
+    async def search_paged_async(self,
+                                 endpoint: str,
+                                 predicate: Predicate,
+                                 page_tag: str = "page",
+                                 total_tag: str = "total",
+                                 pages_tag: str = "total_pages",
+                                 per_page_tag: str = None,
+                                 per_page: int = 10,
+                                 data_key="data",
+                                 cursor: str = None,
+                                 category: str = None,
+                                 concurrency: int = 16,
+                                 adaptive: bool = False,
+                                 ordered: bool = False,
+                                 paging: Union[Paging, None] = None,
+                                 first: bool = False,
+                                 unique: bool = False) -> list:
+        limit = 1 if first else 2 if unique else None
+        stream = self.aiter_search(endpoint, predicate, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category,
+                                   concurrency, adaptive, ordered, paging, limit)
+        try:
+            results = [record async for record in stream]
+        finally:
+            await stream.aclose()
+        if unique and len(results) > 1:
+            raise ValueError("More than one object matches search criteria")
+        return results
+
+    def search_paged(self,
+                     endpoint: str,
+                     predicate: Predicate,
+                     page_tag: str = "page",
+                     total_tag: str = "total",
+                     pages_tag: str = "total_pages",
+                     per_page_tag: str = None,
+                     per_page: int = 10,
+                     data_key="data",
+                     cursor: str = None,
+                     category: str = None,
+                     concurrency: int = 16,
+                     adaptive: bool = False,
+                     ordered: bool = False,
+                     paging: Union[Paging, None] = None,
+                     first: bool = False,
+                     unique: bool = False):
+        self.response_dict = self.run_sync(self.search_paged_async(endpoint, predicate, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category,
+                                                                   concurrency, adaptive, ordered, paging, first, unique))
+        return self
+
+    def iter_paged(self,
+                   endpoint: str,
+                   page_tag: str = "page",
+                   total_tag: str = "total",
+                   pages_tag: str = "total_pages",
+                   per_page_tag: str = None,
+                   per_page: int = 10,
+                   data_key="data",
+                   cursor: str = None,
+                   category: str = None,
+                   concurrency: int = 16,
+                   adaptive: bool = False,
+                   ordered: bool = False,
+                   blocks: bool = False,
+                   paging: Union[Paging, None] = None):
+        stream = self.aiter_paged(endpoint, page_tag, total_tag, pages_tag, per_page_tag, per_page, data_key, cursor, category, concurrency, adaptive, ordered, True, paging)
+        for block in self.loop_thread.iterate(stream):
+            if blocks:
+                yield block
+            else:
+                yield from block
+
+    def download(self,
+                 endpoint: str,
+                 filename: str,
+                 chunk_size: int = 1048576,
+                 resume: bool = False,
+                 segments: int = 1,
+                 checksum: Union[str, None] = None) -> Union[str, None]:
+        return self.run_sync(self.download_async(endpoint, filename, chunk_size, resume, segments, checksum))
+
+    async def download_async(self,
+                             endpoint: str,
+                             filename: str,
+                             chunk_size: int = 1048576,
+                             resume: bool = False,
+                             segments: int = 1,
+                             checksum: Union[str, None] = None) -> Union[str, None]:
+        return await Downloader(self, chunk_size, resume, segments, checksum).fetch(endpoint, filename)
 
     @property
     def is_present(self) -> bool:
@@ -374,44 +1029,132 @@ class RestAPI(object):
     def build_url(self, endpoint: str) -> str:
         return f"{self.url_prefix}{endpoint}"
 
-    @retry(always_raise_list=(BadRequestError, PermissionDeniedError, NotFoundError, UnprocessableEntityError, InternalServerError, NonRetryableError))
+    @retry_async(fatal_errors)
     async def get_data_async(self, endpoint: str, data_key: Union[str, None] = None):
+        return await self._get_data_async(endpoint, data_key)
+
+    @retry_async(fatal_errors)
+    async def get_page_async(self, endpoint: str, window: ConcurrencyWindow, data_key: Union[str, None] = None, predicate: Union[Predicate, None] = None):
+        async with window:
+            if predicate is not None and predicate.equality and '.' not in predicate.path:
+                data, _ = await self._get_payload_async(endpoint, data_key, predicate.path, predicate.value)
+                return data
+            return self.keep(await self._get_data_async(endpoint, data_key), predicate)
+
+    async def get_pages_async(self,
+                              endpoints: Iterable[Tuple[int, str]],
+                              data_key: Union[str, None] = None,
+                              concurrency: int = 16,
+                              adaptive: bool = False,
+                              reorder: Union[PageReorderBuffer, None] = None,
+                              predicate: Union[Predicate, None] = None):
+        window = ConcurrencyWindow(concurrency, adaptive, throttle_errors=(RateLimitError,))
+
+        async def fetch(item: Tuple[int, str]):
+            page, page_endpoint = item
+            if reorder is not None:
+                await reorder.admit(page)
+            return page, await self.get_page_async(page_endpoint, window, data_key, predicate)
+
+        stream = bounded_as_completed(endpoints, fetch, window.max_limit)
+        try:
+            async for page, block in stream:
+                yield page, block
+        finally:
+            await stream.aclose()
+
+    @retry_async(fatal_errors)
+    async def get_json_async(self, endpoint: str):
+        return await self._get_json_async(endpoint)
+
+    async def _get_json_async(self, endpoint: str):
+        return await self._get_payload_async(endpoint)
+
+    async def _get_data_async(self, endpoint: str, data_key: Union[str, None] = None):
+        data, _ = await self._get_payload_async(endpoint, data_key)
+        return data
+
+    async def _get_payload_async(self, endpoint: str, data_key: Union[str, None] = None, key: Union[str, None] = None, value: Any = None):
         url = self.build_url(endpoint)
-        conn = TCPConnector(ssl_context=self.ssl_context)
-        async with ClientSession(headers=self.request_headers, connector=conn) as session:
-            async with session.get(url, verify_ssl=self.verify) as response:
-                data = await response.text()
-                self.validate(response.status, data)
-                self.response_code = response.status
-                self.response_text = data
-                payload = json.loads(data)
-                if data_key:
-                    return payload.get(data_key)
-                else:
-                    return payload
-
-    @retry(always_raise_list=(BadRequestError, PermissionDeniedError, NotFoundError, UnprocessableEntityError, InternalServerError, NonRetryableError))
+        code, body, encoding, headers, entry = await self.cached_get_async(url)
+        if not self.is_success(code):
+            self.check_response(code, body.decode(encoding or "utf-8", errors="replace"), headers)
+        self.response_code = code
+        if self.decode_pool is not None and (entry is None or self.cache is None or self.cache.parsed(entry) is UNPARSED):
+            self.set_response_body(body, encoding)
+            data = await self.decode_pool.decode(body, self.json_loads, data_key, key, value)
+            if not data_key and key is None:
+                self.set_response_body(body, encoding, parsed=data)
+                if entry is not None and self.cache is not None:
+                    self.cache.keep_parsed(entry, data)
+            return data, headers
+        self.set_response_body(body, encoding, entry=entry)
+        return select(self.parsed_body(), data_key, key, value), headers
+
+    async def batch_call_async(self, request: BatchRequest):
+        if request.retryable:
+            return await self.retry_policy.run_async(lambda: self._batch_call_async(request), fatal_errors)
+        return await self.retry_policy.run_async(lambda: self._batch_call_async(request), retry_if=not_processed)
+
+    async def _batch_call_async(self, request: BatchRequest):
+        url = self.build_url(request.endpoint)
+        logger.debug(f"{request.method} {url}")
+        session = self.session_async()
+        async with session.request(request.method, url, json=request.body) as response:
+            data = await response.text()
+            self.check_response(response.status, data, response.headers)
+            return response.status, data
+
+    async def aiter_batch(self, requests_list: Iterable[Any], concurrency: int = 16, progress: Union[ProgressCallback, None] = None):
+        total = len(requests_list) if hasattr(requests_list, '__len__') else None
+        completed = 0
+
+        async def call(item: Tuple[int, Any]) -> BatchResult:
+            index, entry = item
+            request = BatchRequest.from_item(entry)
+            try:
+                code, text = await self.batch_call_async(request)
+                return BatchResult(index, request, code, text)
+            except Exception as err:
+                return BatchResult(index, request, error=err)
+
+        async for result in bounded_as_completed(enumerate(requests_list), call, concurrency):
+            completed += 1
+            if progress is not None:
+                progress(completed, total, result)
+            yield result
+
+    async def batch_async(self, requests_list: Iterable[Any], concurrency: int = 16, ordered: bool = True, progress: Union[ProgressCallback, None] = None) -> List[BatchResult]:
+        results = [result async for result in self.aiter_batch(requests_list, concurrency, progress)]
+        if ordered:
+            results.sort(key=lambda r: r.index)
+        return results
+
+    def batch(self, requests_list: Iterable[Any], concurrency: int = 16, ordered: bool = True, progress: Union[ProgressCallback, None] = None) -> List[BatchResult]:
+        return self.run_sync(self.batch_async(requests_list, concurrency, ordered, progress))
+
+    @retry_async(fatal_errors)
     async def get_kv_async(self, endpoint: str, key: str, value: Union[str, int, bool], data_key: Union[str, None] = None):
-        url = self.build_url(endpoint)
-        conn = TCPConnector(ssl_context=self.ssl_context)
-        async with ClientSession(headers=self.request_headers, connector=conn) as session:
-            async with session.get(url, verify_ssl=self.verify) as response:
-                data = await response.text()
-                self.validate(response.status, data)
-                self.response_code = response.status
-                self.response_text = data
-                payload = json.loads(data)
-                subset = payload.get(data_key) if data_key else payload
-                return [item for item in subset if item.get(key) == value]
+        data, _ = await self._get_payload_async(endpoint, data_key, key, value)
+        return data
 
-    @retry(always_raise_list=(BadRequestError, PermissionDeniedError, NotFoundError, UnprocessableEntityError, InternalServerError, NonRetryableError))
-    async def get_stream_async(self, endpoint: str):
+    async def open_stream_async(self, url: str):
+        response = await self.session_async().get(url)
+        if not self.is_success(response.status):
+            text = await response.text()
+            response.release()
+            self.check_response(response.status, text, response.headers)
+        return response
+
+    async def get_stream_async(self, endpoint: str, chunk_size: Union[int, None] = None):
         url = self.build_url(endpoint)
         logger.debug(f"Stream from: {url}")
-        conn = TCPConnector(ssl_context=self.ssl_context)
-        async with ClientSession(headers=self.request_headers, connector=conn) as session:
-            async with session.get(url, verify_ssl=self.verify) as response:
-                self.validate(response.status)
+        response = await self.retry_policy.run_async(lambda: self.open_stream_async(url), fatal_errors)
+        async with response:
+            if chunk_size:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+            else:
                 async for chunk, _ in response.content.iter_chunks():
                     yield chunk
 
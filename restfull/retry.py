@@ -0,0 +1,157 @@
+##
+##
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from functools import wraps
+from contextvars import ContextVar
+from typing import Union, Tuple, Type, Callable, Awaitable, Any
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger('restfull.retry')
+logger.addHandler(logging.NullHandler())
+retry_attempt: ContextVar[int] = ContextVar("retry_attempt", default=0)
+
+
+class RetryBudget(object):
+
+    def __init__(self, ratio: float = 0.2, min_retries: float = 10.0, capacity: float = 100.0):
+        self.ratio = ratio
+        self.capacity = max(capacity, min_retries)
+        self.tokens = min_retries
+        self.exhausted = 0
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self.lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            self.exhausted += 1
+            return False
+
+
+class RetryPolicy(object):
+
+    def __init__(self,
+                 total: int = 10,
+                 backoff: float = 0.1,
+                 max_backoff: float = 10.0,
+                 max_elapsed: Union[float, None] = 60.0,
+                 budget: Union[RetryBudget, None] = None,
+                 status_codes: Tuple[int, ...] = (429, 502, 503, 504),
+                 respect_retry_after: bool = True):
+        self.total = total
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.budget = budget if budget is not None else RetryBudget()
+        self.status_codes = status_codes
+        self.respect_retry_after = respect_retry_after
+        self.retries = 0
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def record_request(self):
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def allow_retry(self, started: float, delay: float = 0.0) -> bool:
+        if self.max_elapsed is not None and time.monotonic() - started + delay > self.max_elapsed:
+            return False
+        if self.budget is not None and not self.budget.withdraw():
+            return False
+        self.retries += 1
+        return True
+
+    def next_delay(self, attempt: int, started: float, retry_after: Union[float, None] = None) -> Union[float, None]:
+        if attempt >= self.total:
+            return None
+        if retry_after is not None and self.respect_retry_after:
+            delay = retry_after + random.uniform(0, self.backoff)
+        else:
+            delay = self.backoff_delay(attempt)
+        return delay if self.allow_retry(started, delay) else None
+
+    async def run_async(self,
+                        call: Callable[[], Awaitable[Any]],
+                        always_raise: Tuple[Type[BaseException], ...] = (),
+                        allow: Union[Tuple[Type[BaseException], ...], None] = None,
+                        retry_if: Union[Callable[[BaseException], bool], None] = None) -> Any:
+        self.record_request()
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            token = retry_attempt.set(attempt)
+            try:
+                return await call()
+            except Exception as err:
+                if getattr(err, "status", None) not in self.status_codes and (isinstance(err, always_raise) or (allow and not isinstance(err, allow))):
+                    raise
+                if retry_if is not None and not retry_if(err):
+                    raise
+                delay = self.next_delay(attempt, started, getattr(err, "retry_after", None))
+                if delay is None:
+                    logger.debug(f"Retry limit reached after {attempt} retries: {err}")
+                    raise
+                attempt += 1
+                logger.debug(f"Retry {attempt} in {delay:.3f}s: {err}")
+                await asyncio.sleep(delay)
+            finally:
+                retry_attempt.reset(token)
+
+    def urllib3_retry(self) -> Retry:
+        return PolicyRetry(total=self.total,
+                           status_forcelist=self.status_codes,
+                           backoff_factor=self.backoff,
+                           respect_retry_after_header=self.respect_retry_after,
+                           raise_on_status=False,
+                           policy=self)
+
+    def stats(self) -> dict:
+        return {"retries": self.retries, "budget_exhausted": self.budget.exhausted if self.budget is not None else 0}
+
+
+class PolicyRetry(Retry):
+
+    def __init__(self, *args, policy: Union[RetryPolicy, None] = None, started: Union[float, None] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.policy = policy
+        self.started = started
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.policy = self.policy
+        retry.started = self.started if self.started is not None else time.monotonic()
+        return retry
+
+    def get_backoff_time(self) -> float:
+        if self.policy is None:
+            return super().get_backoff_time()
+        return self.policy.backoff_delay(max(0, len(self.history) - 1))
+
+    def is_exhausted(self) -> bool:
+        if super().is_exhausted():
+            return True
+        if self.policy is None or not self.history or self.history[-1].redirect_location is not None:
+            return False
+        return not self.policy.allow_retry(self.started if self.started is not None else time.monotonic())
+
+
+def retry_async(always_raise: Tuple[Type[BaseException], ...] = (), allow: Union[Tuple[Type[BaseException], ...], None] = None) -> Callable:
+
+    def retry_handler(func):
+        @wraps(func)
+        async def f_wrapper(self, *args, **kwargs):
+            return await self.retry_policy.run_async(lambda: func(self, *args, **kwargs), always_raise, allow)
+
+        return f_wrapper
+    return retry_handler
@@ -0,0 +1,100 @@
+##
+##
+
+import os
+import json
+import mmap
+import logging
+import tempfile
+import weakref
+from array import array
+from typing import Union, Any, IO, Iterable, Iterator
+from restfull.store import RecordStore
+from restfull.json_backend import JsonLoads, json_backend
+
+logger = logging.getLogger('restfull.spill')
+logger.addHandler(logging.NullHandler())
+
+
+def release(fd: IO, buffers: list, path: str):
+    for buffer in buffers:
+        buffer.close()
+    buffers.clear()
+    fd.close()
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    logger.debug(f"Removed spill file {path}")
+
+
+class SpillStore(RecordStore):
+
+    def __init__(self, directory: Union[str, None] = None, loads: Union[JsonLoads, None] = None):
+        super().__init__()
+        self.loads = loads if loads is not None else json_backend()
+        handle, self.path = tempfile.mkstemp(prefix="restfull-", suffix=".ndjson", dir=directory)
+        self.fd = os.fdopen(handle, 'w+b')
+        self.offsets = array('q', [0])
+        self.buffers = []
+        self.mapped = 0
+        self.finalizer = weakref.finalize(self, release, self.fd, self.buffers, self.path)
+        logger.debug(f"Spilling records to {self.path}")
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any], directory: Union[str, None] = None, loads: Union[JsonLoads, None] = None) -> 'SpillStore':
+        store = cls(directory, loads)
+        store.extend(records)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def append(self, record: Any):
+        line = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+        self.fd.write(line)
+        self.offsets.append(self.offsets[-1] + len(line))
+        self.orders.clear()
+
+    def extend(self, records: Iterable[Any]):
+        for record in records:
+            self.append(record)
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets[-1]
+
+    @property
+    def closed(self) -> bool:
+        return not self.finalizer.alive
+
+    def buffer(self) -> mmap.mmap:
+        if self.closed:
+            raise ValueError(f"Spill store {self.path} is closed")
+        if not self.buffers or self.mapped < self.offsets[-1]:
+            self.fd.flush()
+            for buffer in self.buffers:
+                buffer.close()
+            self.buffers[:] = [mmap.mmap(self.fd.fileno(), 0, access=mmap.ACCESS_READ)]
+            self.mapped = self.offsets[-1]
+        return self.buffers[0]
+
+    def record(self, index: int) -> Any:
+        return self.loads(self.buffer()[self.offsets[index]:self.offsets[index + 1]])
+
+    def __iter__(self) -> Iterator[Any]:
+        if not len(self):
+            return
+        buffer = self.buffer()
+        offsets = self.offsets
+        for index in range(len(self)):
+            yield self.loads(buffer[offsets[index]:offsets[index + 1]])
+
+    def close(self):
+        self.finalizer()
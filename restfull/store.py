@@ -0,0 +1,64 @@
+##
+##
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Iterator
+from restfull.query import value_at, freeze
+
+
+class RecordStore(ABC):
+
+    def __init__(self):
+        self.orders: Dict[tuple, List[int]] = {}
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def record(self, index: int) -> Any:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"record index {index} out of range")
+        return self.record(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def values(self, key: str) -> List[Any]:
+        return [value_at(record, key) for record in self]
+
+    def argsort(self, key: str, reverse: bool = False) -> List[int]:
+        order = self.orders.get((key, reverse))
+        if order is None:
+            values = self.values(key)
+            present = [i for i, item in enumerate(values) if item is not None]
+            order = sorted(present, key=lambda i: values[i], reverse=reverse) + [i for i, item in enumerate(values) if item is None]
+            self.orders[(key, reverse)] = order
+        return order
+
+    def sorted(self, key: str, reverse: bool = False) -> List[Any]:
+        return [self.record(index) for index in self.argsort(key, reverse)]
+
+    def lookup(self, key: str, value: Any) -> List[Any]:
+        target = freeze(value)
+        return [self.record(index) for index, item in enumerate(self.values(key)) if freeze(item) == target]
+
+    def group_by(self, key: str) -> Dict[Any, List[Any]]:
+        groups = {}
+        for index, item in enumerate(self.values(key)):
+            groups.setdefault(freeze(item), []).append(self.record(index))
+        return groups
+
+    def as_list(self) -> List[Any]:
+        return list(self)
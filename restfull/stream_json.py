@@ -0,0 +1,154 @@
+##
+##
+
+import re
+import json
+import codecs
+from typing import Union, Any, List, Iterator, Callable
+
+non_space = re.compile(r'\S')
+number_continuation = frozenset('0123456789.eE+-')
+
+
+class NeedMoreData(Exception):
+    pass
+
+
+class JsonStreamParser(object):
+
+    def __init__(self, data_key: Union[str, None] = None, ndjson: bool = False, loads: Callable[[str], Any] = json.loads):
+        self.data_key = data_key
+        self.ndjson = ndjson
+        self.loads = loads
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.buffer = ""
+        self.pos = 0
+        self.pending = []
+        self.pending_size = 0
+        self.retry_at = 0
+        self.final = False
+        self.state = "start"
+        self.meta = {}
+
+    @property
+    def available(self) -> int:
+        return len(self.buffer) - self.pos + self.pending_size
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        text = self.text_decoder.decode(chunk)
+        if text:
+            self.pending.append(text)
+            self.pending_size += len(text)
+        if self.available < self.retry_at:
+            return []
+        return list(self.parse())
+
+    def close(self) -> List[Any]:
+        text = self.text_decoder.decode(b'', final=True)
+        if text:
+            self.pending.append(text)
+            self.pending_size += len(text)
+        self.final = True
+        records = list(self.parse())
+        if self.state not in ("done", "ndjson") or non_space.search(self.buffer, self.pos):
+            raise ValueError(f"Truncated or malformed JSON stream (state {self.state})")
+        return records
+
+    def skip(self) -> str:
+        match = non_space.search(self.buffer, self.pos)
+        if not match:
+            self.pos = len(self.buffer)
+            raise NeedMoreData()
+        self.pos = match.start()
+        return self.buffer[self.pos]
+
+    def expect(self, char: str):
+        if self.skip() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, found '{self.buffer[self.pos]}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.skip()
+        try:
+            item, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            if self.final:
+                raise
+            self.retry_at = 2 * (len(self.buffer) - self.pos)
+            raise NeedMoreData()
+        if not self.final and (end >= len(self.buffer) or (self.buffer[end] in number_continuation and type(item) in (int, float))):
+            self.retry_at = len(self.buffer) - self.pos + 1
+            raise NeedMoreData()
+        self.pos = end
+        return item
+
+    def parse(self) -> Iterator[Any]:
+        if self.pending:
+            self.buffer = self.buffer[self.pos:] + ''.join(self.pending)
+            self.pos = 0
+            self.pending = []
+            self.pending_size = 0
+        self.retry_at = 0
+        while True:
+            start = self.pos
+            try:
+                if self.state == "start":
+                    if self.ndjson:
+                        self.state = "ndjson"
+                        continue
+                    char = self.skip()
+                    if self.data_key is None and char == '[':
+                        self.pos += 1
+                        self.state = "array"
+                    elif self.data_key is not None and char == '{':
+                        self.pos += 1
+                        self.state = "object"
+                    else:
+                        yield self.value()
+                        self.state = "done"
+                elif self.state == "object":
+                    char = self.skip()
+                    if char == '}':
+                        self.pos += 1
+                        self.state = "done"
+                        continue
+                    if char == ',':
+                        self.pos += 1
+                    key = self.value()
+                    self.expect(':')
+                    if key == self.data_key and self.skip() == '[':
+                        self.pos += 1
+                        self.state = "array"
+                    elif key == self.data_key:
+                        yield self.value()
+                    else:
+                        self.meta[key] = self.value()
+                elif self.state == "array":
+                    char = self.skip()
+                    if char == ']':
+                        self.pos += 1
+                        self.state = "object" if self.data_key is not None else "done"
+                        continue
+                    if char == ',':
+                        self.pos += 1
+                    yield self.value()
+                elif self.state == "ndjson":
+                    end = self.buffer.find('\n', self.pos)
+                    if end < 0 and not self.final:
+                        raise NeedMoreData()
+                    end = len(self.buffer) if end < 0 else end
+                    line = self.buffer[self.pos:end].strip()
+                    self.pos = end + 1
+                    if line:
+                        yield self.loads(line)
+                    if self.pos > len(self.buffer):
+                        self.pos = len(self.buffer)
+                        return
+                else:
+                    self.skip()
+                    return
+            except NeedMoreData:
+                if self.state != "ndjson":
+                    self.pos = start
+                return
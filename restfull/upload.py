@@ -0,0 +1,87 @@
+##
+##
+
+import io
+import os
+import json
+import mmap
+from contextlib import contextmanager
+from typing import Union, Iterable, Iterator, AsyncIterator, Any, Callable
+
+
+def iter_readable(fd: Any, chunk_size: int) -> Iterator[bytes]:
+    for chunk in iter(lambda: fd.read(chunk_size), b''):
+        yield chunk
+
+
+def iter_mmap(view: mmap.mmap, chunk_size: int) -> Iterator[bytes]:
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset:offset + chunk_size]
+
+
+def iter_encoded(items: Iterable[Union[bytes, str]]) -> Iterator[bytes]:
+    for item in items:
+        yield item.encode('utf-8') if isinstance(item, str) else bytes(item)
+
+
+def iter_ndjson(records: Iterable[Any], chunk_size: int = 1048576, dumps: Callable[[Any], str] = json.dumps) -> Iterator[bytes]:
+    buffer = []
+    size = 0
+    for record in records:
+        line = dumps(record).encode('utf-8') + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+async def aiter_source(source: Any, chunk_size: int) -> AsyncIterator[bytes]:
+    if hasattr(source, '__aiter__'):
+        async for item in source:
+            yield item.encode('utf-8') if isinstance(item, str) else bytes(item)
+    elif isinstance(source, mmap.mmap):
+        for chunk in iter_mmap(source, chunk_size):
+            yield chunk
+    elif hasattr(source, 'read'):
+        for chunk in iter_readable(source, chunk_size):
+            yield chunk
+    else:
+        for chunk in iter_encoded(source):
+            yield chunk
+
+
+def rewindable(body: Any) -> bool:
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return True
+    seekable = getattr(body, 'seekable', None)
+    if callable(seekable):
+        return seekable()
+    return hasattr(body, 'seek') and hasattr(body, 'tell')
+
+
+@contextmanager
+def upload_body(source: Any):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fd:
+            yield fd
+    elif isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'read'):
+        yield source
+    else:
+        yield iter_encoded(source)
+
+
+@contextmanager
+def upload_body_async(source: Any, chunk_size: int = 1048576):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fd:
+            yield fd
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    elif isinstance(source, io.IOBase):
+        yield source
+    else:
+        yield aiter_source(source, chunk_size)
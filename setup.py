@@ -20,6 +20,12 @@ setup(
         "python-certifi-win32>=1.6.1",
         "certifi>=2023.5.7"
     ],
+    extras_require={
+        "orjson": ["orjson>=3.9.0"],
+        "ujson": ["ujson>=5.8.0"],
+        "numpy": ["numpy>=1.22.0"],
+        "pandas": ["pandas>=1.4.0"]
+    },
     author_email='info@unix.us.com',
     description='Python REST API Frontend',
     long_description=long_description,
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import math
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+from typing import List, Callable, Union
+from restfull import __version__
+from restfull.restapi import RestAPI
+from restfull.no_auth import NoAuth
+from restfull.retry import RetryPolicy
+from restfull.json_backend import available_backends, json_backend
+from restfull.stream_json import JsonStreamParser
+from tests.local_server import LocalServer
+
+SCENARIOS = ("get", "get_async", "get_paged", "download", "json")
+
+
+def percentile(samples: List[float], p: float) -> Union[float, None]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * p / 100.0) - 1))]
+
+
+def summarize(name: str, samples: List[float], elapsed: float, operations: int, **extra) -> dict:
+    result = {
+        "name": name,
+        "operations": operations,
+        "elapsed": elapsed,
+        "ops_per_sec": operations / elapsed if elapsed else None,
+        "mean": sum(samples) / len(samples) if samples else None,
+        "p50": percentile(samples, 50),
+        "p99": percentile(samples, 99)
+    }
+    result.update(extra)
+    return result
+
+
+def timed(func: Callable[[int], None], iterations: int):
+    samples = []
+    start = time.perf_counter()
+    for n in range(iterations):
+        begin = time.perf_counter()
+        func(n)
+        samples.append(time.perf_counter() - begin)
+    return samples, time.perf_counter() - start
+
+
+def rest_api(server: LocalServer) -> RestAPI:
+    return RestAPI(NoAuth(), server.hostname, False, port=server.port, coalesce=False, retry_policy=RetryPolicy(backoff=0.01))
+
+
+def bench_get(server: LocalServer, options: argparse.Namespace) -> dict:
+    with rest_api(server) as rest:
+        samples, elapsed = timed(lambda n: rest.get(f"/api/users/{n % server.total + 1}").validate(), options.requests)
+    return summarize("get", samples, elapsed, options.requests)
+
+
+def bench_get_async(server: LocalServer, options: argparse.Namespace) -> dict:
+    async def run():
+        samples = []
+        semaphore = asyncio.Semaphore(options.concurrency)
+
+        async def fetch(n: int):
+            async with semaphore:
+                begin = time.perf_counter()
+                await rest.get_data_async(f"/api/users/{n % server.total + 1}", data_key="data")
+                samples.append(time.perf_counter() - begin)
+
+        async with rest_api(server) as rest:
+            start = time.perf_counter()
+            await asyncio.gather(*[fetch(n) for n in range(options.requests)])
+            return samples, time.perf_counter() - start
+
+    samples, elapsed = asyncio.run(run())
+    return summarize("get_async", samples, elapsed, options.requests, concurrency=options.concurrency)
+
+
+def bench_get_paged(server: LocalServer, options: argparse.Namespace) -> dict:
+    pages = -(-server.total // server.per_page)
+    with rest_api(server) as rest:
+        samples, elapsed = timed(lambda n: rest.get_paged("/api/users", per_page_tag="per_page", per_page=server.per_page, concurrency=options.concurrency).validate(),
+                                 options.repeat)
+    return summarize("get_paged", samples, elapsed, options.repeat, pages=pages, pages_per_sec=pages * options.repeat / elapsed, records=server.total)
+
+
+def bench_download(server: LocalServer, options: argparse.Namespace) -> dict:
+    size = len(server.blob)
+    with tempfile.TemporaryDirectory() as directory, rest_api(server) as rest:
+        filename = os.path.join(directory, "download.bin")
+        samples, elapsed = timed(lambda n: rest.download("/api/download", filename, segments=options.segments), options.repeat)
+    return summarize("download", samples, elapsed, options.repeat, bytes=size, mb_per_sec=size * options.repeat / elapsed / 1048576, segments=options.segments)
+
+
+def bench_json(server: LocalServer, options: argparse.Namespace) -> List[dict]:
+    document = json.dumps({"total": server.total, "data": [server.user(n) for n in range(1, server.total + 1)]}).encode()
+    chunks = [document[i:i + 65536] for i in range(0, len(document), 65536)]
+    iterations = options.repeat * 10
+    results = []
+
+    def parse_body(rest: RestAPI):
+        rest.set_response_body(document)
+        assert rest.as_json("data").json_list().size == server.total
+
+    def parse_stream(loads):
+        parser = JsonStreamParser(data_key="data", loads=loads)
+        records = []
+        for chunk in chunks:
+            records.extend(parser.feed(chunk))
+        records.extend(parser.close())
+        assert len(records) == server.total
+
+    with rest_api(server) as rest:
+        for name in available_backends():
+            loads = json_backend(name)
+            rest.set_json_backend(name)
+            for label, func in ((f"json_{name}", lambda n: loads(document)),
+                                (f"json_as_json_{name}", lambda n: parse_body(rest)),
+                                (f"json_stream_{name}", lambda n: parse_stream(loads))):
+                samples, elapsed = timed(func, iterations)
+                results.append(summarize(label, samples, elapsed, iterations, bytes=len(document), mb_per_sec=len(document) * iterations / elapsed / 1048576))
+    return results
+
+
+def run(options: argparse.Namespace) -> dict:
+    server = LocalServer(total=options.total,
+                         per_page=options.per_page,
+                         latency=options.latency,
+                         payload=options.payload,
+                         blob_size=options.blob_size,
+                         throttle_every=options.throttle_every).start()
+    results = []
+    try:
+        for scenario in options.scenarios.split(","):
+            if scenario not in SCENARIOS:
+                raise ValueError(f"Unknown scenario {scenario}, choose from {', '.join(SCENARIOS)}")
+            server.reset(latency=options.latency)
+            result = globals()[f"bench_{scenario}"](server, options)
+            for entry in (result if isinstance(result, list) else [result]):
+                entry["server_requests"] = server.requests
+                entry["throttled"] = server.throttled
+                results.append(entry)
+    finally:
+        server.stop()
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(options),
+        "results": results
+    }
+
+
+def parse_args(argv: Union[List[str], None] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark restfull against a local HTTP server")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--total", type=int, default=1000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--payload", type=int, default=0)
+    parser.add_argument("--blob-size", type=int, default=16 * 1048576)
+    parser.add_argument("--segments", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Union[List[str], None] = None):
+    options = parse_args(argv)
+    report = json.dumps(run(options), indent=2)
+    if options.output:
+        with open(options.output, 'w') as fd:
+            fd.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+##
+##
+
+import re
+import os
+import json
+import hashlib
+import time
+import asyncio
+import threading
+from typing import Union
+from aiohttp import web
+
+
+class LocalServer(object):
+
+    def __init__(self,
+                 total: int = 12,
+                 per_page: int = 6,
+                 latency: float = 0.0,
+                 max_inflight: Union[int, None] = None,
+                 payload: int = 0,
+                 blob_size: int = 3 * 1048576 + 12345,
+                 throttle_every: Union[int, None] = None):
+        self.total = total
+        self.per_page = per_page
+        self.latency = latency
+        self.max_inflight = max_inflight
+        self.payload = payload
+        self.throttle_every = throttle_every
+        self.port = None
+        self.requests = 0
+        self.throttled = 0
+        self.inflight = 0
+        self.peak = 0
+        self.peers = set()
+        self.blob = os.urandom(blob_size)
+        self.drop_after: Union[int, None] = None
+        self.ranged = True
+        self.version = 1
+        self.not_modified = 0
+        self.limited_calls = 0
+        self.conflicts = 0
+        self.unavailable = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.runner = None
+
+    @property
+    def hostname(self) -> str:
+        return "127.0.0.1"
+
+    @property
+    def connections(self) -> int:
+        return len(self.peers)
+
+    def user(self, n: int) -> dict:
+        record = {"id": n, "email": f"user{n}@example.com", "first_name": f"First{n}", "last_name": f"Last{n}"}
+        if self.payload:
+            record["bio"] = "x" * self.payload
+        return record
+
+    def track(self, request: web.Request):
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info('peername'))
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        self.track(request)
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        try:
+            if (self.max_inflight is not None and self.inflight > self.max_inflight) or (self.throttle_every and self.requests % self.throttle_every == 0):
+                self.throttled += 1
+                return web.json_response({"message": "slow down"}, status=429)
+            if self.unavailable:
+                self.unavailable -= 1
+                return web.json_response({"message": "unavailable"}, status=503, headers={"Retry-After": "0"})
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await handler(request)
+        finally:
+            self.inflight -= 1
+
+    async def users(self, request: web.Request):
+        page = int(request.query.get("page", 1))
+        per_page = int(request.query.get("per_page", self.per_page))
+        total_pages = (self.total + per_page - 1) // per_page
+        start = (page - 1) * per_page + 1
+        end = min(start + per_page, self.total + 1)
+        return web.json_response({
+            "page": page,
+            "per_page": per_page,
+            "total": self.total,
+            "total_pages": total_pages,
+            "data": [self.user(n) for n in range(start, end)]
+        })
+
+    def window(self, offset: int, limit: int) -> list:
+        return [self.user(n) for n in range(offset + 1, min(offset + limit, self.total) + 1)]
+
+    async def items(self, request: web.Request):
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", self.per_page))
+        body = {"data": self.window(offset, limit)}
+        if "nototal" not in request.query:
+            body["total"] = self.total
+        return web.json_response(body)
+
+    async def cursor(self, request: web.Request):
+        offset = int(request.query.get("cursor", 0))
+        limit = int(request.query.get("limit", self.per_page))
+        next_offset = offset + limit
+        return web.json_response({
+            "data": self.window(offset, limit),
+            "meta": {"next_cursor": str(next_offset) if next_offset < self.total else None}
+        })
+
+    async def linked(self, request: web.Request):
+        page = int(request.query.get("page", 1))
+        offset = (page - 1) * self.per_page
+        headers = {}
+        if offset + self.per_page < self.total:
+            headers["Link"] = f'<http://{self.hostname}:{self.port}/api/linked?page={page + 1}>; rel="next"'
+        return web.json_response(self.window(offset, self.per_page), headers=headers)
+
+    async def create_user(self, request: web.Request):
+        body = await request.json()
+        if body.get("conflict"):
+            return self.conflict()
+        return web.json_response(dict(body, id=self.total + 1), status=201)
+
+    def conflict(self):
+        self.conflicts += 1
+        return web.json_response({"message": "conflict"}, status=409)
+
+    async def update_user(self, request: web.Request):
+        body = await request.json()
+        if body.get("conflict"):
+            return self.conflict()
+        return web.json_response(dict(body, id=int(request.match_info["id"])))
+
+    async def delete_user(self, request: web.Request):
+        return web.Response(status=204)
+
+    async def download(self, request: web.Request):
+        start, end = 0, len(self.blob) - 1
+        match = re.match(r'bytes=(\d+)-(\d*)', request.headers.get("Range", ""))
+        if match and self.ranged:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{len(self.blob)}"})
+            response = web.StreamResponse(status=206, headers={"Content-Range": f"bytes {start}-{end}/{len(self.blob)}"})
+        else:
+            response = web.StreamResponse(status=200)
+        response.content_length = end - start + 1
+        await response.prepare(request)
+        limit = self.drop_after
+        for offset in range(start, end + 1, 65536):
+            chunk = self.blob[offset:min(offset + 65536, end + 1)]
+            if limit is not None and limit <= len(chunk):
+                await response.write(chunk[:limit])
+                self.drop_after = None
+                request.transport.close()
+                return response
+            if limit is not None:
+                limit -= len(chunk)
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    async def upload(self, request: web.Request):
+        hasher = hashlib.sha1()
+        size = 0
+        lines = 0
+        async for chunk in request.content.iter_chunked(65536):
+            hasher.update(chunk)
+            size += len(chunk)
+            lines += chunk.count(b'\n')
+        return web.json_response({
+            "bytes": size,
+            "sha1": hasher.hexdigest(),
+            "lines": lines,
+            "chunked": request.headers.get("Transfer-Encoding", "").lower() == "chunked",
+            "content_type": request.headers.get("Content-Type")
+        }, status=201)
+
+    async def export(self, request: web.Request):
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        ndjson = "ndjson" in request.query
+        if not ndjson:
+            await response.write(b'{"total": %d, "data": [' % self.total)
+        for n in range(1, self.total + 1):
+            record = json.dumps(self.user(n)).encode()
+            if ndjson:
+                await response.write(record + b'\n')
+            else:
+                await response.write(record + (b', ' if n < self.total else b''))
+        if not ndjson:
+            await response.write(b'], "next_cursor": "abc \\" ]}"}')
+        await response.write_eof()
+        return response
+
+    async def config(self, request: web.Request):
+        etag = f'"v{self.version}"'
+        last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.json_response({"version": self.version, "data": [self.user(n) for n in range(1, self.total + 1)]},
+                                 headers={"ETag": etag, "Last-Modified": last_modified})
+
+    async def limited(self, request: web.Request):
+        self.limited_calls += 1
+        if self.limited_calls == 1:
+            return web.json_response({"message": "slow down"}, status=429, headers={"Retry-After": "1"})
+        return web.json_response({"data": [self.limited_calls]},
+                                 headers={"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.5"})
+
+    async def user_by_id(self, request: web.Request):
+        n = int(request.match_info["id"])
+        if n < 1 or n > self.total:
+            return web.json_response({}, status=404)
+        return web.json_response({"data": self.user(n)})
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/api/users", self.users)
+        app.router.add_get("/api/users/{id}", self.user_by_id)
+        app.router.add_post("/api/users", self.create_user)
+        app.router.add_put("/api/users/{id}", self.update_user)
+        app.router.add_patch("/api/users/{id}", self.update_user)
+        app.router.add_delete("/api/users/{id}", self.delete_user)
+        app.router.add_get("/api/items", self.items)
+        app.router.add_get("/api/cursor", self.cursor)
+        app.router.add_get("/api/linked", self.linked)
+        app.router.add_get("/api/download", self.download)
+        app.router.add_get("/api/export", self.export)
+        app.router.add_get("/api/config", self.config)
+        app.router.add_get("/api/limited", self.limited)
+        app.router.add_post("/api/limited", self.limited)
+        app.router.add_post("/api/upload", self.upload)
+        app.router.add_put("/api/upload", self.upload)
+        return app
+
+    async def _start(self):
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.hostname, 0)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    def start(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return self
+
+    def quiesce(self, settle: float = 0.05, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            seen = self.requests
+            time.sleep(settle)
+            if self.inflight == 0 and self.requests == seen:
+                return self
+        raise TimeoutError("Local server did not go idle")
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def reset(self, latency: float = 0.0, max_inflight: Union[int, None] = None):
+        self.latency = latency
+        self.max_inflight = max_inflight
+        self.requests = 0
+        self.throttled = 0
+        self.peak = 0
+        self.peers = set()
+        self.version = 1
+        self.not_modified = 0
+        self.limited_calls = 0
+        self.conflicts = 0
+        self.unavailable = 0
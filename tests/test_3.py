@@ -0,0 +1,916 @@
+#!/usr/bin/env python3
+
+import logging
+import pytest
+import warnings
+import asyncio
+import unittest
+import os
+import json
+import hashlib
+import tempfile
+import mmap
+import time
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from restfull.restapi import RestAPI, NotFoundError
+from restfull.async_restapi import AsyncRestAPI
+from restfull.no_auth import NoAuth
+from restfull.stream_json import JsonStreamParser
+from restfull.paging import PageReorderBuffer, OffsetLimitPaging, CursorPaging, LinkHeaderPaging
+from restfull.cache import ResponseCache, MemoryCache, DiskCache, CacheEntry, UNPARSED
+from restfull.ratelimit import RateLimiter
+from restfull.retry import RetryPolicy, RetryBudget
+from restfull.restapi import RateLimitError, RetryableError
+from restfull.batch import BatchRequest
+from restfull.metrics import MetricsAggregator, Histogram
+from restfull.query import field, match
+from restfull.data import JsonList
+from restfull.columnar import ColumnStore
+from restfull.store import RecordStore
+from restfull.spill import SpillStore
+from restfull.decode import DecodePool
+from restfull.concurrency import bounded_as_completed
+from restfull.loop import LoopThread
+from tests.local_server import LocalServer
+from tests import benchmark
+
+warnings.filterwarnings("ignore")
+logger = logging.getLogger('tests.test_3')
+logger.addHandler(logging.NullHandler())
+
+
+@pytest.mark.local_test
+class TestMain(unittest.TestCase):
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(total=100, per_page=5).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+
+    def rest_api(self, **kwargs) -> RestAPI:
+        return RestAPI(NoAuth(), self.server.hostname, False, port=self.server.port, **kwargs)
+
+    def test_1(self):
+        with self.rest_api(pool_limit=4) as rest:
+            data = rest.get_paged("/api/users").validate().json_list()
+            assert data.size == 100
+            assert sorted(d["id"] for d in data.as_list) == list(range(1, 101))
+        assert self.server.connections <= 5
+
+    def test_2(self):
+        async def fetch():
+            async with self.rest_api(pool_limit=2) as rest:
+                blocks = await asyncio.gather(*[rest.get_data_async(f"/api/users/{n}", data_key="data") for n in range(1, 21)])
+                return [b["id"] for b in blocks]
+
+        assert asyncio.run(fetch()) == list(range(1, 21))
+        assert self.server.connections == 2
+
+    def test_3(self):
+        self.server.reset(latency=0.01)
+        rest = self.rest_api()
+        data = rest.get_paged("/api/users", concurrency=3).validate().json_list()
+        assert data.size == 100
+        assert self.server.peak <= 3
+
+    def test_4(self):
+        self.server.reset(latency=0.01, max_inflight=4)
+        rest = self.rest_api()
+        data = rest.get_paged("/api/users", concurrency=16, adaptive=True).validate().json_list()
+        assert data.size == 100
+        assert len(set(d["id"] for d in data.as_list)) == 100
+        assert self.server.throttled > 0
+
+    def test_5(self):
+        self.server.reset(latency=0.005)
+        rest = self.rest_api()
+        calls = []
+        run = rest.loop_thread.run
+        rest.loop_thread.run = lambda coro: calls.append(coro) or run(coro)
+        ids = [record["id"] for record in rest.iter_paged("/api/users", concurrency=8, ordered=True)]
+        assert ids == list(range(1, 101)) and len(calls) <= 22
+        blocks = list(rest.iter_paged("/api/users", concurrency=8, blocks=True))
+        assert len(blocks) == 20
+        assert sum(len(block) for block in blocks) == 100
+
+    def test_6(self):
+        async def consume():
+            count = 0
+            async with self.rest_api() as rest:
+                async for record in rest.aiter_paged("/api/users", per_page_tag="per_page", per_page=7):
+                    count += 1
+            return count
+
+        assert asyncio.run(consume()) == 100
+
+    def test_7(self):
+        self.server.reset(latency=0.002)
+        rest = self.rest_api()
+        data = rest.get_paged("/api/users", concurrency=6, ordered=True).validate().json_list()
+        assert [record["id"] for record in data.as_list] == list(range(1, 101))
+
+    def test_8(self):
+        async def reorder():
+            buffer = PageReorderBuffer(1, 2)
+            assert await buffer.put(2, "b") == []
+            admitted = asyncio.ensure_future(buffer.admit(3))
+            await asyncio.sleep(0.01)
+            assert not admitted.done()
+            assert await buffer.put(1, "a") == ["a", "b"]
+            await asyncio.wait_for(admitted, 1)
+            return buffer.peak
+
+        assert asyncio.run(reorder()) == 2
+
+    def test_9(self):
+        rest = self.rest_api()
+        data = rest.get_paged("/api/items", paging=OffsetLimitPaging(limit=7), ordered=True).validate().json_list()
+        assert [record["id"] for record in data.as_list] == list(range(1, 101))
+        ids = [record["id"] for record in rest.iter_paged("/api/items?nototal=1", paging=OffsetLimitPaging(limit=7))]
+        assert ids == list(range(1, 101))
+
+    def test_10(self):
+        rest = self.rest_api()
+        paging = CursorPaging(cursor_key="meta.next_cursor", limit_tag="limit", limit=9)
+        ids = [record["id"] for record in rest.iter_paged("/api/cursor", paging=paging)]
+        assert ids == list(range(1, 101))
+        assert self.server.requests == 12
+
+    def test_11(self):
+        rest = self.rest_api()
+        data = rest.get_paged("/api/linked", paging=LinkHeaderPaging()).validate().json_list()
+        assert [record["id"] for record in data.as_list] == list(range(1, 101))
+
+    def test_12(self):
+        async def mutate():
+            async with AsyncRestAPI(NoAuth(), self.server.hostname, False, port=self.server.port) as rest:
+                created = (await rest.post("/api/users", {"name": "morpheus"})).validate().json()
+                updated = await asyncio.gather(*[rest.put(f"/api/users/{n}", {"job": "leader"}) for n in range(1, 51)])
+                patched = (await rest.patch("/api/users/2", {"job": "zion"})).validate().as_json().json_key("job")
+                deleted = (await rest.delete("/api/users/2")).validate().code
+                records = (await rest.get_paged("/api/users")).validate().filter("id", 7).list()
+                try:
+                    (await rest.get("/api/users/500")).validate()
+                except NotFoundError:
+                    missing = True
+                else:
+                    missing = False
+                return created, len(updated), patched, deleted, records, missing
+
+        created, updated, patched, deleted, records, missing = asyncio.run(mutate())
+        assert created == {"name": "morpheus", "id": 101}
+        assert updated == 50
+        assert patched == "zion"
+        assert deleted == 204
+        assert records[0]["email"] == "user7@example.com"
+        assert missing
+
+    def test_13(self):
+        self.server.reset(latency=0.005)
+        rest = self.rest_api()
+        progress = []
+        requests_list = [f"/api/users/{n}" for n in range(1, 106)] + [("POST", "/api/users", {"name": "neo"})]
+        results = rest.batch(requests_list, concurrency=8, progress=lambda done, total, result: progress.append((done, total)))
+        assert [r.index for r in results] == list(range(106))
+        assert [r.json("data")["id"] for r in results[:100]] == list(range(1, 101))
+        assert all(isinstance(r.error, NotFoundError) for r in results[100:105])
+        assert results[105].code == 201 and results[105].json()["name"] == "neo"
+        assert progress[-1] == (106, 106)
+        assert self.server.peak <= 8
+
+    def test_14(self):
+        rest = self.rest_api()
+
+        def lookup(n: int):
+            response = rest.send("GET", f"/api/users/{n}")
+            try:
+                return response.validate().as_json("data").json_key("id")
+            except NotFoundError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            ids = list(executor.map(lookup, range(1, 121)))
+        assert ids == list(range(1, 101)) + [None] * 20
+
+        async def lookups():
+            responses = await asyncio.gather(*[rest.send_async("GET", f"/api/users/{n}") for n in range(1, 51)])
+            return [response.validate().as_json("data").json_key("id") for response in responses]
+
+        assert asyncio.run(lookups()) == list(range(1, 51))
+        response = rest.send("POST", "/api/users", {"name": "trinity"})
+        assert response.code == 201 and response.json()["name"] == "trinity"
+        assert response.headers["content-type"].startswith("application/json")
+
+    def test_15(self):
+        rest = self.rest_api(pool_maxsize=4, tcp_keepalive=30)
+
+        def lookup(n: int):
+            return rest.send("GET", f"/api/users/{n}").validate().as_json("data").json_key("id")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ids = list(executor.map(lookup, range(1, 101)))
+        assert ids == list(range(1, 101))
+        stats = rest.connection_stats()
+        assert stats["created"] <= 4
+        assert stats["reused"] >= 96
+        assert stats["discarded"] == 0
+
+        rest = self.rest_api(pool_maxsize=1)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lookup, range(1, 101)))
+        stats = rest.connection_stats()
+        assert stats["created"] > 1
+        assert stats["discarded"] > 0
+
+    def test_16(self):
+        rest = self.rest_api(json_backend="json")
+        rest.get("/api/users?page=2")
+        first = rest.json()
+        assert rest.json() is first
+        assert rest.json("data") is first["data"]
+        assert rest.as_json("data").list_item(0)["id"] == 6
+        rest.get("/api/users?page=3")
+        assert rest.json("page") == 3
+        rest.set_json_backend("auto")
+        assert rest.json("page") == 3
+        rest.response_text = "not json"
+        assert rest.json() == {}
+        with self.assertRaises(ValueError):
+            rest.set_json_backend("nosuchjson")
+
+    def test_17(self):
+        rest = self.rest_api()
+        expected = hashlib.sha1(self.server.blob).hexdigest()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'file.bin')
+            self.server.drop_after = 1000000
+            assert rest.download("/api/download", temp_file, chunk_size=65536, checksum="sha1") == expected
+            assert self.server.requests == 2
+
+            with open(temp_file, 'r+b') as fd:
+                fd.truncate(777777)
+            assert rest.download("/api/download", temp_file, resume=True, checksum="sha1") == expected
+
+            os.remove(temp_file)
+            self.server.reset()
+            assert rest.download("/api/download", temp_file, chunk_size=262144, segments=4, checksum="sha1") == expected
+            assert self.server.requests == 5
+            with open(temp_file, 'rb') as fd:
+                assert hashlib.sha1(fd.read()).hexdigest() == expected
+
+            self.server.ranged = False
+            try:
+                assert rest.download("/api/download", temp_file, resume=True, checksum="sha1") == expected
+                assert os.path.getsize(temp_file) == len(self.server.blob)
+            finally:
+                self.server.ranged = True
+
+    def test_18(self):
+        rest = self.rest_api()
+        expected = hashlib.sha1(self.server.blob).hexdigest()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'file.bin')
+            with open(temp_file, 'wb') as fd:
+                fd.write(self.server.blob)
+            result = rest.upload("/api/upload", temp_file).validate().json()
+            assert result["sha1"] == expected and not result["chunked"]
+            with open(temp_file, 'rb') as fd, mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                assert rest.upload("/api/upload", view, method="PUT").validate().json("sha1") == expected
+
+                async def upload_view():
+                    async with self.rest_api() as client:
+                        return (await client.upload_async("/api/upload", view, chunk_size=65536)).validate().json()
+
+                result = asyncio.run(upload_view())
+                assert result["sha1"] == expected and result["chunked"]
+
+        chunks = (self.server.blob[offset:offset + 65536] for offset in range(0, len(self.server.blob), 65536))
+        result = rest.upload("/api/upload", chunks).validate().json()
+        assert result["sha1"] == expected and result["chunked"]
+
+        result = rest.upload_ndjson("/api/upload", ({"id": n} for n in range(10000)), chunk_size=4096).validate().json()
+        assert result["lines"] == 10000 and result["content_type"] == "application/x-ndjson"
+
+    def test_19(self):
+        rest = self.rest_api()
+        ids = [record["id"] for record in rest.stream_records("/api/export", data_key="data", chunk_size=7)]
+        assert ids == list(range(1, 101))
+        ids = [record["id"] for record in rest.stream_records("/api/export?ndjson=1", ndjson=True, chunk_size=100)]
+        assert ids == list(range(1, 101))
+
+        async def collect():
+            async with self.rest_api() as client:
+                return [record["id"] async for record in client.aiter_records("/api/export", data_key="data", chunk_size=13)]
+
+        assert asyncio.run(collect()) == list(range(1, 101))
+
+        document = '{"meta": {"pages": [1, 2]}, "data": [1, 22.5, "x\\"y", {"a": [true, null]}, [], -3e2], "after": "z"}'.encode()
+        parser = JsonStreamParser("data")
+        records = []
+        for offset in range(len(document)):
+            records.extend(parser.feed(document[offset:offset + 1]))
+        records.extend(parser.close())
+        assert records == [1, 22.5, 'x"y', {"a": [True, None]}, [], -300.0]
+        assert parser.meta == {"meta": {"pages": [1, 2]}, "after": "z"}
+
+        parser = JsonStreamParser()
+        assert parser.feed(b'[1, 2') == [1]
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_20(self):
+        cache = ResponseCache(ttl=0, share_parsed=True)
+        rest = self.rest_api(cache=cache)
+        first = rest.get("/api/config").validate().as_json("data").json_list()
+        parsed = rest.json()
+        assert first.size == 100
+        assert rest.get("/api/config").validate().json() is parsed
+        assert self.server.not_modified == 1
+        self.server.version = 2
+        assert rest.get("/api/config").json()["version"] == 2
+        assert cache.stats.revalidated == 1 and cache.stats.stores == 2 and cache.stats.misses == 2
+
+        fresh = ResponseCache(MemoryCache(max_entries=2), ttl=60)
+        rest.set_cache(fresh)
+        requests_before = self.server.requests
+        for n in (1, 2, 1, 3, 1):
+            assert rest.get(f"/api/users/{n}").json()["data"]["id"] == n
+        assert self.server.requests - requests_before == 3
+        assert fresh.stats.hits == 2 and fresh.stats.evictions == 1
+        assert rest.get_bytes("/api/users/1").content() == rest.get("/api/users/1").response_text.encode()
+
+        async def fetch():
+            async with self.rest_api(cache=cache) as client:
+                payload, headers = await client.get_json_async("/api/config")
+                return payload["version"], headers.get("etag")
+
+        assert asyncio.run(fetch()) == (2, '"v2"')
+        assert self.server.not_modified == 2
+
+        with tempfile.TemporaryDirectory() as directory:
+            rest.set_cache(ResponseCache(DiskCache(directory), ttl=0))
+            rest.get("/api/config")
+            rest.set_cache(ResponseCache(DiskCache(directory), ttl=0))
+            assert rest.get("/api/config").json()["version"] == 2
+            assert rest.cache_stats()["revalidated"] == 1
+
+    def test_21(self):
+        self.server.reset(latency=0.2)
+        rest = self.rest_api()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: rest.send("GET", "/api/users/7"), range(8)))
+        assert [r.validate().as_json("data").record()["id"] for r in responses] == [7] * 8
+        assert self.server.requests == 1
+
+        async def fetch(coalesce: bool, endpoint: str):
+            async with self.rest_api(coalesce=coalesce) as client:
+                return await asyncio.gather(*[client.get_data_async(endpoint, data_key="data") for _ in range(10)], return_exceptions=True)
+
+        self.server.reset(latency=0.2)
+        assert [block["id"] for block in asyncio.run(fetch(True, "/api/users/3"))] == [3] * 10
+        assert self.server.requests == 1
+        self.server.reset(latency=0.2)
+        results = asyncio.run(fetch(True, "/api/users/1000"))
+        assert all(isinstance(result, NotFoundError) for result in results)
+        assert self.server.requests == 1
+        self.server.reset(latency=0.05)
+        asyncio.run(fetch(False, "/api/users/3"))
+        assert self.server.requests == 10
+
+    def test_22(self):
+        rest = self.rest_api(rate_limiter=RateLimiter(rate=20, burst=1))
+        start = time.perf_counter()
+        for n in range(1, 11):
+            rest.get(f"/api/users/{n}").validate()
+        assert time.perf_counter() - start >= 0.4
+
+        limiter = RateLimiter(endpoints={"/api/users": (50, 5)})
+        rest.set_rate_limiter(limiter)
+        start = time.perf_counter()
+        assert rest.get_paged("/api/users").json_list().size == 100
+        assert time.perf_counter() - start >= 0.25
+        assert limiter.delayed > 0
+        assert rest.get("/api/config").code == 200
+
+        limiter = RateLimiter()
+        rest.set_rate_limiter(limiter)
+        assert rest.get("/api/limited").validate().code == 200
+        start = time.perf_counter()
+        assert rest.get("/api/limited").validate().code == 200
+        assert time.perf_counter() - start >= 0.4
+
+        async def fetch():
+            async with self.rest_api(rate_limiter=limiter) as client:
+                started = time.perf_counter()
+                data = await client.get_data_async("/api/limited", data_key="data")
+                return data, time.perf_counter() - started
+
+        self.server.reset()
+        data, elapsed = asyncio.run(fetch())
+        assert data == [2] and elapsed >= 0.9
+
+    def test_23(self):
+        async def fetch(policy: RetryPolicy, endpoint: str):
+            async with self.rest_api(retry_policy=policy) as client:
+                ticks = 0
+
+                async def ticker():
+                    nonlocal ticks
+                    while True:
+                        await asyncio.sleep(0.05)
+                        ticks += 1
+
+                task = asyncio.ensure_future(ticker())
+                started = time.perf_counter()
+                try:
+                    return await client.get_data_async(endpoint, data_key="data"), time.perf_counter() - started, ticks
+                finally:
+                    task.cancel()
+
+        data, elapsed, ticks = asyncio.run(fetch(RetryPolicy(), "/api/limited"))
+        assert data == [2] and elapsed >= 0.9 and ticks >= 10
+
+        self.server.reset()
+        with self.assertRaises(RateLimitError):
+            asyncio.run(fetch(RetryPolicy(max_elapsed=0.5), "/api/limited"))
+        assert self.server.requests == 1
+
+        self.server.reset(max_inflight=0)
+        policy = RetryPolicy(backoff=0.01, budget=RetryBudget(ratio=0.0, min_retries=2))
+        with self.assertRaises(RateLimitError):
+            asyncio.run(fetch(policy, "/api/users/1"))
+        assert self.server.requests == 3
+        assert policy.stats() == {"retries": 2, "budget_exhausted": 1}
+
+        self.server.reset(max_inflight=0)
+        rest = self.rest_api(retry_policy=RetryPolicy(total=3, backoff=0.01))
+        assert rest.get("/api/users/1").code == 429
+        assert self.server.requests == 4
+        self.server.reset(max_inflight=0)
+        rest.set_retry_policy(RetryPolicy(backoff=0.01, budget=RetryBudget(ratio=0.0, min_retries=1)))
+        assert rest.get("/api/users/1").code == 429
+        assert self.server.requests == 2
+
+    def test_24(self):
+        histogram = Histogram()
+        for n in range(1, 1001):
+            histogram.add(n / 1000.0)
+        summary = histogram.summary()
+        assert summary["count"] == 1000 and summary["min"] == 0.001 and summary["max"] == 1.0
+        assert abs(summary["p50"] - 0.5) <= 0.02 and abs(summary["p99"] - 0.99) <= 0.03
+
+        rest = self.rest_api()
+        metrics = rest.add_metrics_hook()
+        events = []
+        rest.add_metrics_hook(events.append)
+        for n in range(1, 6):
+            rest.get(f"/api/users/{n}").validate()
+        rest.post("/api/users", {"name": "neo"})
+        sync = metrics.summary()["GET /api/users/1"]
+        assert sync["count"] == 1 and sync["status"] == {200: 1} and sync["bytes_received"] > 0
+        assert events[0].connect is not None and events[0].dns is not None and events[0].tls is None
+        assert events[0].reused is False and events[1].reused is True
+        assert events[-1].method == "POST" and events[-1].bytes_sent == len(b'{"name": "neo"}')
+
+        async def fetch():
+            async with rest:
+                await asyncio.gather(*[rest.get_data_async(f"/api/users/{n}") for n in range(1, 11)])
+
+        metrics.reset()
+        events.clear()
+        asyncio.run(fetch())
+        assert len(events) == 10 and all(e.status == 200 and e.total >= e.ttfb and e.bytes_received > 0 for e in events)
+        assert sum(1 for e in events if e.reused is False) == sum(1 for e in events if e.connect is not None)
+        assert all(e.tls is None for e in events)
+        by_method = MetricsAggregator(key=lambda m: m.method)
+        for event in events:
+            by_method(event)
+        total = by_method.summary()["GET"]["timings"]["total"]
+        assert list(by_method.summary()) == ["GET"] and total["count"] == 10
+        assert total["min"] <= total["p50"] <= total["p90"] <= total["p99"] <= total["max"]
+        assert abs(total["mean"] - sum(e.total for e in events) / 10) < 1e-9
+        assert metrics.summary()["GET /api/users/10"]["timings"]["ttfb"]["count"] == 1
+
+        self.server.reset(max_inflight=0)
+        rest = self.rest_api(retry_policy=RetryPolicy(total=2, backoff=0.01))
+        events = []
+        rest.add_metrics_hook(events.append)
+        assert rest.get("/api/users/1").code == 429
+        assert [e.retries for e in events] == [2]
+
+        async def fail():
+            async with rest:
+                await rest.get_data_async("/api/users/1")
+
+        events.clear()
+        with self.assertRaises(RateLimitError):
+            asyncio.run(fail())
+        assert [e.retries for e in events] == [0, 1, 2] and all(e.status == 429 for e in events)
+
+    def test_25(self):
+        report = benchmark.run(benchmark.parse_args(["--requests", "40", "--repeat", "2", "--total", "60", "--per-page", "10", "--blob-size", "262144", "--throttle-every", "25"]))
+        names = [result["name"] for result in report["results"]]
+        assert names[:4] == ["get", "get_async", "get_paged", "download"] and "json_json" in names
+        assert "json_as_json_json" in names and "json_stream_json" in names
+        for result in report["results"]:
+            assert result["ops_per_sec"] > 0 and result["p50"] <= result["p99"]
+        assert report["results"][0]["throttled"] >= 1
+        json.dumps(report)
+
+    def test_26(self):
+        rest = self.rest_api()
+
+        def paged(_):
+            return rest.run_sync(rest.get_paged_endpoint("/api/users", concurrency=4))
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(paged, range(6)))
+        assert all(sorted(d["id"] for d in data) == list(range(1, 101)) for data in results)
+        assert len(rest._sessions_async) == 1
+        loop = rest.loop_thread.loop
+        assert rest.get_paged("/api/users").json_list().size == 100
+        assert rest.loop_thread.loop is loop
+
+        async def inside_running_loop():
+            return rest.get_paged("/api/users", concurrency=2).json_list().size, [record["id"] for record in rest.iter_paged("/api/users")][:3]
+
+        assert asyncio.run(inside_running_loop()) == (100, [1, 2, 3])
+
+        async def from_loop_thread():
+            return rest.get_paged("/api/users")
+
+        with self.assertRaises(RuntimeError):
+            rest.run_sync(from_loop_thread())
+        rest.close()
+        assert not rest.loop_thread.running and not rest._sessions_async
+
+        loop_thread = LoopThread()
+        loop, thread = loop_thread.loop, loop_thread.thread
+        loop.call_soon_threadsafe(loop_thread.stop)
+        thread.join(5)
+        assert not thread.is_alive() and loop.is_closed() and not loop_thread.running
+
+    def test_27(self):
+        rest = self.rest_api().get_paged("/api/users", ordered=True)
+        query = rest.query()
+        assert rest.list_item(41)["id"] == 42 and rest.list_item(500) is None
+        assert rest.lookup("email", "user7@example.com")[0]["id"] == 7
+        assert rest.query() is query and list(query.indexes) == ["email"]
+        assert [r["id"] for r in rest.where(field("id").gt(90) & (field("id").le(95) | field("first_name").eq("First99"))).list()] == [91, 92, 93, 94, 95, 99]
+        assert rest.query() is not query
+        assert rest.filter("id", 93).record()["last_name"] == "Last93"
+
+        records = [{"id": n, "team": {"name": f"t{n % 3}"}, "active": n % 2 == 0, "score": None if n == 5 else n * 7 % 10} for n in range(1, 13)]
+        data = JsonList(records)
+        groups = data.group_by("team.name")
+        assert sorted(groups) == ["t0", "t1", "t2"] and [r["id"] for r in groups["t1"]] == [1, 4, 7, 10]
+        assert [r["id"] for r in data.where(match(team__name="t1", active=True)).as_list] == [4, 10]
+        assert data.where(match(team__name="t1", active=True), field("score").ge(8)).size == 1
+        ordered = data.sorted("score")
+        assert ordered == data.sorted("score") and ordered[-1]["id"] == 5
+        assert [r["score"] for r in ordered[:3]] == [0, 1, 2]
+        ordered.reverse()
+        assert data.sorted("score")[-1]["id"] == 5 and data.query().orders[("score", False)][0]["score"] == 0
+        assert data.lookup("team", {"name": "t2"})[0]["id"] == 2
+
+        response = self.rest_api().send("GET", "/api/users?per_page=20").as_json("data")
+        assert response.where(field("email").contains("user1")).list()[0]["id"] == 1
+        assert response.filter("id", 20).record()["id"] == 20
+
+    def test_28(self):
+        rest = self.rest_api().get_paged("/api/users", ordered=True, compact=True)
+        assert isinstance(rest.response_dict, ColumnStore) and rest.json_list().is_compact
+        data = rest.json_list()
+        assert data.size == 100 and data.item(41)["id"] == 42 and rest.list_item(-1)["id"] == 100
+        assert data.as_list == [record for record in rest.records()] and data.as_list[6]["email"] == "user7@example.com"
+        assert data.sorted("id", reverse=True)[0]["id"] == 100
+        assert rest.lookup("email", "user9@example.com")[0]["id"] == 9
+        assert [r["id"] for r in rest.where(field("id").gt(97)).list()] == [98, 99, 100]
+
+        records = [{"id": n, "name": f"n{n % 4}", "score": n * 1.5, "ok": n % 2 == 0, "tags": [n]} for n in range(1, 21)]
+        records[3]["score"] = None
+        del records[5]["name"]
+        records[7]["id"] = 2 ** 70
+        store = ColumnStore.from_records(records)
+        assert store.as_list() == records and store[-1] == records[-1] and store[2:4] == records[2:4]
+        assert store.columns["name"].kind == "str" and len(store.columns["name"].strings) == 4
+        assert store.columns["score"].kind == "float" and store.columns["ok"].kind == "bool" and store.columns["id"].kind == "object"
+        assert store.select("name", "==", "n1") == [0, 4, 8, 12, 16]
+        assert store.select("score", ">", 27) == [18, 19]
+        assert store.filter("ok", "==", True).column("id")[:3] == [2, 4, 6]
+        assert store.sort("score", reverse=True).column("score")[0] == 30.0
+        assert list(store.project("name", "ok").columns) == ["name", "ok"]
+        assert JsonList(records).compact().group_by("name")["n3"][0]["id"] == 3
+        async def compact_async():
+            async with AsyncRestAPI(NoAuth(), self.server.hostname, False, port=self.server.port) as client:
+                return (await client.get_paged("/api/users", compact=True)).json_list()
+
+        data = asyncio.run(compact_async())
+        assert data.is_compact and data.size == 100
+
+        with self.assertRaises(TypeError):
+            type("Partial", (RecordStore,), {"__len__": lambda self: 0})()
+        wide = [{"id": n, "name": f"n{n % 4}", "score": n * 1.5, "ok": n % 2 == 0} for n in range(1000)]
+        assert ColumnStore.from_records(wide).nbytes < len(json.dumps(wide))
+
+    def test_29(self):
+        with tempfile.TemporaryDirectory() as directory:
+            rest = self.rest_api().get_paged("/api/users", ordered=True, spill=True, spill_dir=directory)
+            store = rest.response_dict
+            assert isinstance(store, SpillStore) and os.listdir(directory) == [os.path.basename(store.path)]
+            data = rest.json_list()
+            assert data.is_spilled and data.size == 100
+            assert rest.list_item(41)["id"] == 42 and store.nbytes == os.path.getsize(store.path)
+            assert rest.list_item(41)["id"] == 42 and rest.list_item(-1)["id"] == 100 and rest.list_item(100) is None
+            assert [record["id"] for record in rest.records()] == list(range(1, 101))
+            assert data.sorted("id", reverse=True)[0]["id"] == 100 and data.as_list[6]["email"] == "user7@example.com"
+            assert rest.filter("email", "user9@example.com").record()["id"] == 9
+            del store, data
+            assert not os.listdir(directory)
+
+            records = [{"id": n, "nested": {"v": [n, None]}, "score": None if n == 3 else n} for n in range(1, 6)]
+            spilled = JsonList(list(records)).spill(directory)
+            assert spilled.as_list == records and spilled.item(2) == records[2] and spilled.sorted("score")[-1]["id"] == 3
+            spilled.data_list.append({"id": 6})
+            assert spilled.size == 6 and spilled.item(-1) == {"id": 6} and spilled.lookup("id", 6) == [{"id": 6}]
+            async def spill_async():
+                async with AsyncRestAPI(NoAuth(), self.server.hostname, False, port=self.server.port) as client:
+                    return (await client.get_paged("/api/users", spill=True, spill_dir=directory)).json_list()
+
+            assert asyncio.run(spill_async()).size == 100
+            with spilled.data_list as store:
+                path = store.path
+            assert store.closed and not os.path.exists(path)
+
+    def test_30(self):
+        pages = -(-self.server.total // self.server.per_page)
+        with DecodePool(workers=2, min_size=0) as pool:
+            rest = self.rest_api()
+            rest.set_decode_pool(pool)
+            assert [record["id"] for record in rest.get_paged("/api/users", ordered=True).records()] == list(range(1, 101))
+            assert pool.stats()["offloaded"] == pages and pool.stats()["inline"] == 0
+            assert asyncio.run(rest.get_kv_async("/api/users?per_page=20", "email", "user3@example.com", data_key="data"))[0]["id"] == 3
+            assert rest.get_paged("/api/users", compact=True).json_list().size == 100
+        assert pool._executor is None
+
+        with DecodePool(workers=2, processes=True, max_pending=2, min_size=0) as pool:
+            rest = self.rest_api()
+            rest.set_decode_pool(pool)
+            assert sorted(record["id"] for record in rest.get_paged("/api/users", concurrency=8).records()) == list(range(1, 101))
+            assert pool.offloaded == pages
+
+        small = DecodePool()
+        rest = self.rest_api()
+        rest.set_decode_pool(small)
+        assert rest.get_paged("/api/users").json_list().size == 100 and small.inline == pages and small._executor is None
+
+    def test_31(self):
+        self.server.reset(latency=0.01)
+        rest = self.rest_api()
+        assert rest.search_paged("/api/users", match(email="user57@example.com"), concurrency=2, first=True).record()["id"] == 57
+        assert self.server.quiesce().requests < 20
+
+        self.server.reset()
+        assert [r["id"] for r in rest.search_paged("/api/users", field("id").gt(90), ordered=True).list()] == list(range(91, 101))
+        assert rest.search_paged("/api/users", match(email="user9@example.com"), unique=True).unique()["id"] == 9
+        assert self.server.quiesce().requests == 40
+        self.server.reset()
+        with self.assertRaises(ValueError):
+            rest.search_paged("/api/users", field("id").le(2), unique=True)
+        assert self.server.quiesce().requests == 1
+
+        with DecodePool(workers=2, min_size=0) as pool:
+            rest.set_decode_pool(pool)
+            assert rest.search_paged("/api/users", match(last_name="Last42")).record()["id"] == 42 and pool.offloaded == 20
+
+        async def take():
+            async with self.rest_api(coalesce=False) as client:
+                return [r["id"] async for r in client.aiter_search("/api/users", field("id").ge(50), concurrency=1, ordered=True, limit=3)]
+
+        async def search_async():
+            async with AsyncRestAPI(NoAuth(), self.server.hostname, False, port=self.server.port) as client:
+                return (await client.search_paged("/api/users", match(id=77), first=True)).record()["id"]
+
+        assert asyncio.run(search_async()) == 77
+        self.server.quiesce().reset()
+        assert asyncio.run(take()) == [50, 51, 52] and self.server.quiesce().requests < 20
+
+    def test_32(self):
+        async def echo(item: int) -> int:
+            await asyncio.sleep(0)
+            return item
+
+        async def break_early():
+            stream = bounded_as_completed(range(200), echo, 4)
+            first = await stream.__anext__()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            await asyncio.wait_for(stream.aclose(), 2)
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            return first, pending
+
+        first, pending = asyncio.run(break_early())
+        assert first == 0 and not pending
+
+    def test_33(self):
+        self.server.reset(latency=0.02)
+        rest = self.rest_api()
+        for record in rest.iter_paged("/api/users", concurrency=8):
+            break
+
+        async def pending():
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        assert rest.run_sync(pending()) == []
+        time.sleep(0.05)
+        sent = self.server.requests
+        time.sleep(0.2)
+        assert self.server.requests == sent < 20
+
+        async def break_early():
+            async with self.rest_api() as client:
+                stream = client.aiter_paged("/api/users", concurrency=8)
+                await stream.__anext__()
+                await stream.aclose()
+                return await pending()
+
+        assert asyncio.run(break_early()) == []
+        rest.close()
+
+    def test_34(self):
+        def loop_threads() -> int:
+            return len([thread for thread in threading.enumerate() if thread.name == "restfull-loop"])
+
+        baseline = loop_threads()
+        for _ in range(10):
+            rest = self.rest_api()
+            assert rest.get_paged("/api/users", concurrency=2).json_list().size == 100
+        assert loop_threads() > baseline
+        del rest
+        gc.collect()
+        assert loop_threads() == baseline
+
+        rest = self.rest_api()
+        for n in range(1, 6):
+            assert asyncio.run(rest.get_data_async(f"/api/users/{n}", data_key="data"))["id"] == n
+        assert len(rest._sessions_async) == 1 and all(session.closed for session in rest._sessions_async.values())
+
+        loop = rest.loop
+        assert rest.loop is loop and not loop.is_running()
+        assert loop.run_until_complete(rest.get_data_async("/api/users/7", data_key="data"))["id"] == 7
+        rest.close()
+        assert not rest._sessions_async
+        loop.close()
+
+    def test_35(self):
+        rest = self.rest_api(retry_policy=RetryPolicy(total=2, backoff=0.01))
+        conflict = {"conflict": True}
+        results = rest.batch([("POST", "/api/users", conflict), ("PATCH", "/api/users/1", conflict)], concurrency=1)
+        assert all(isinstance(r.error, RetryableError) and r.error.status == 409 for r in results)
+        assert self.server.conflicts == 2
+
+        self.server.reset()
+        results = rest.batch([("PUT", "/api/users/1", conflict), BatchRequest("/api/users", "post", conflict, retry=True)], concurrency=1)
+        assert not any(r.ok for r in results) and self.server.conflicts == 6
+        assert [BatchRequest.from_item(item).retryable for item in ("/api/users", ("DELETE", "/api/users/1"), ("POST", "/api/users"), {"endpoint": "/x", "method": "PATCH", "retry": True})] == [True, True, False, True]
+
+        self.server.reset()
+        result = rest.batch([("POST", "/api/limited", {"n": 1})])[0]
+        assert result.ok and result.json("data") == [2] and self.server.limited_calls == 2
+
+    def test_36(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory)
+            bodies = [bytes([n]) * (4096 * (n + 1)) for n in range(8)]
+            seen = []
+
+            def writer(n: int):
+                for i in range(100):
+                    body = bodies[(n + i) % len(bodies)]
+                    cache.set("key", CacheEntry("/api/x", 200, body, headers={"ETag": hashlib.md5(body).hexdigest()}))
+
+            def reader(_):
+                for _ in range(200):
+                    entry = cache.get("key")
+                    if entry is not None:
+                        seen.append(entry.etag == hashlib.md5(entry.body).hexdigest())
+
+            writer(0)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda n: writer(n) if n < 4 else reader(n), range(8)))
+            assert seen and all(seen)
+            assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+            with open(cache.path(cache.file_name("key"), "body"), 'r+b') as fd:
+                fd.truncate(100)
+            assert cache.get("key") is None
+
+        rest = self.rest_api(cache=ResponseCache(ttl=60))
+        rest.get("/api/users/1").json()["data"]["email"] = "changed"
+        assert rest.get("/api/users/1").json()["data"]["email"] == "user1@example.com"
+        rest.get("/api/users/1").json()["data"].clear()
+        assert rest.get("/api/users/1").json()["data"]["id"] == 1 and rest.cache_stats()["hits"] >= 3
+        assert all(entry.parsed is UNPARSED for entry in rest.cache.backend.entries.values())
+
+        pool = DecodePool(workers=2, min_size=0)
+        rest = self.rest_api(cache=ResponseCache(ttl=60), decode_pool=pool)
+
+        async def fetch():
+            async with rest:
+                first = await rest.get_data_async("/api/users/2", data_key="data")
+                first["email"] = "changed"
+                return await rest.get_data_async("/api/users/2", data_key="data")
+
+        with pool:
+            assert asyncio.run(fetch())["email"] == "user2@example.com"
+            assert pool.offloaded == 2 and rest.cache_stats()["hits"] == 1
+
+    def test_37(self):
+        rest = self.rest_api(retry_policy=RetryPolicy(backoff=0.01))
+        expected = hashlib.sha1(self.server.blob).hexdigest()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'file.bin')
+            assert rest.download("/api/download", temp_file, checksum="sha1") == expected
+            assert rest.download("/api/download", temp_file, resume=True, checksum="sha1") == expected
+            with open(temp_file, 'ab') as fd:
+                fd.write(b"stale")
+            assert rest.download("/api/download", temp_file, resume=True, checksum="sha1") == expected
+            assert os.path.getsize(temp_file) == len(self.server.blob)
+
+        self.server.reset()
+        self.server.throttle_every = 2
+        try:
+            rest.get("/api/users/1").validate()
+            chunks = rest.run_sync(self.collect(rest.get_stream_async("/api/users/2")))
+            assert json.loads(b"".join(chunks))["data"]["id"] == 2 and self.server.throttled == 1
+        finally:
+            self.server.throttle_every = None
+
+    @staticmethod
+    async def collect(stream):
+        return [chunk async for chunk in stream]
+
+    def test_38(self):
+        async def mixed():
+            async with AsyncRestAPI(NoAuth(), self.server.hostname, False, port=self.server.port) as rest:
+                first, second, updated, missing = await asyncio.gather(rest.get("/api/users/1"), rest.get("/api/users/50"), rest.put("/api/users/2", {"job": "pilot"}),
+                                                                       rest.get("/api/users/500"))
+                raw = await rest.get_bytes("/api/users/3")
+                return first, second, updated, missing, raw
+
+        first, second, updated, missing, raw = asyncio.run(mixed())
+        assert len({id(first), id(second), id(updated), id(missing)}) == 4
+        assert first.validate().json("data")["id"] == 1 and second.json("data")["id"] == 50 and updated.json()["job"] == "pilot"
+        assert missing.code == 404
+        with self.assertRaises(NotFoundError):
+            missing.validate()
+        assert json.loads(raw.content)["data"]["id"] == 3 and raw.validate().json("data")["id"] == 3
+
+    def test_39(self):
+        rest = self.rest_api(retry_policy=RetryPolicy(backoff=0.01))
+        self.server.unavailable = 1
+        assert rest.get("/api/users/1").validate().json()["data"]["id"] == 1 and self.server.requests == 2
+
+        async def fetch():
+            async with AsyncRestAPI(NoAuth(), self.server.hostname, False, port=self.server.port, retry_policy=RetryPolicy(total=2, backoff=0.01)) as client:
+                self.server.unavailable = 1
+                data = await client.get_data_async("/api/users/2", data_key="data")
+                self.server.unavailable = 1
+                fetched = await client.get("/api/users/3")
+                self.server.unavailable = 1
+                created = await client.post("/api/users", {"name": "neo"})
+                self.server.unavailable = 5
+                exhausted = await client.get("/api/users/4")
+                return data, fetched, created, exhausted
+
+        self.server.reset()
+        data, fetched, created, exhausted = asyncio.run(fetch())
+        assert data["id"] == 2 and fetched.validate().json("data")["id"] == 3
+        assert created.code == 503 and exhausted.code == 503
+        assert self.server.requests == 2 + 2 + 1 + 3
+
+    def test_40(self):
+        rest = self.rest_api(retry_policy=RetryPolicy(backoff=0.01))
+        blob = self.server.blob[:262144]
+        expected = hashlib.sha1(blob).hexdigest()
+        with tempfile.TemporaryFile() as fd:
+            fd.write(blob)
+            fd.seek(0)
+            self.server.unavailable = 1
+            result = rest.upload("/api/upload", fd, method="PUT").validate().json()
+            assert result["sha1"] == expected and self.server.requests == 2
+
+        self.server.reset()
+        self.server.unavailable = 1
+        chunks = (blob[offset:offset + 65536] for offset in range(0, len(blob), 65536))
+        assert rest.upload("/api/upload", chunks, method="PUT").code == 503 and self.server.requests == 1
+        result = rest.upload("/api/upload", [blob], method="PUT").validate().json()
+        assert result["sha1"] == expected